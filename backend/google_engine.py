@@ -1,17 +1,34 @@
 """
 高效Google搜索引擎
 基于googlesearch库的优化版本
+同步版本（search / search_crypto_info）使用requests，
+异步版本（async_search / async_search_crypto_info）复用全局aiohttp连接池（keep-alive + DNS缓存）
+两者的每个请求都经过同一个自适应限流器（backend/services/rate_limiter.py），被限流时自动降速
 """
 
+import asyncio
 from time import sleep
-from bs4 import BeautifulSoup
+from contextlib import aclosing
+from typing import List
 from requests import get
-from urllib.parse import unquote
 import random
+from backend.serp_extractor import extract_results
+from backend.services.rate_limiter import get_search_rate_limiter, is_throttled_response
+from backend.services.search_cache import get_search_cache
 from backend.utils.logger import setup_logger
+from backend.utils.env_loader import get_env_var
 
 logger = setup_logger(__name__)
 
+SEARCH_URL = "https://www.google.com/search"
+# 绕过同意页面
+SEARCH_COOKIES = {
+    'CONSENT': 'PENDING+987',
+    'SOCS': 'CAESHAgBEhIaAB',
+}
+
+_session = None  # 全局aiohttp.ClientSession，首次异步搜索时创建
+
 
 def get_useragent():
     """
@@ -27,31 +44,48 @@ def get_useragent():
     return f"{lynx_version} {libwww_version} {ssl_mm_version} {openssl_version}"
 
 
+def _search_headers():
+    return {
+        "User-Agent": get_useragent(),
+        "Accept": "*/*"
+    }
+
+
+def _search_params(term, results, lang, start, safe, region):
+    params = {
+        "q": term,
+        "num": results + 2,  # 防止多次请求
+        "hl": lang,
+        "start": start,
+        "safe": safe,
+    }
+    if region:
+        params["gl"] = region
+    return params
+
+
+class SearchThrottledError(Exception):
+    """Google返回429或验证码页"""
+
+
 def _req(term, results, lang, start, proxies, timeout, safe, ssl_verify, region):
-    """发送Google搜索请求"""
+    """发送Google搜索请求，受全局自适应限流器约束"""
+    limiter = get_search_rate_limiter()
+    limiter.acquire_blocking()
     try:
         resp = get(
-            url="https://www.google.com/search",
-            headers={
-                "User-Agent": get_useragent(),
-                "Accept": "*/*"
-            },
-            params={
-                "q": term,
-                "num": results + 2,  # 防止多次请求
-                "hl": lang,
-                "start": start,
-                "safe": safe,
-                "gl": region,
-            },
+            url=SEARCH_URL,
+            headers=_search_headers(),
+            params=_search_params(term, results, lang, start, safe, region),
             proxies=proxies,
             timeout=timeout,
             verify=ssl_verify,
-            cookies={
-                'CONSENT': 'PENDING+987',  # 绕过同意页面
-                'SOCS': 'CAESHAgBEhIaAB',
-            }
+            cookies=SEARCH_COOKIES,
         )
+        throttled = is_throttled_response(resp.status_code, resp.url, resp.text)
+        limiter.report_blocking(throttled)
+        if throttled:
+            raise SearchThrottledError(f"Google限流 (HTTP {resp.status_code}): {resp.url}")
         resp.raise_for_status()
         logger.debug(f"Google搜索请求成功: {term}")
         return resp
@@ -60,6 +94,13 @@ def _req(term, results, lang, start, proxies, timeout, safe, ssl_verify, region)
         raise
 
 
+def _parse_results(html):
+    """
+    解析Google结果页，返回 [(链接, 标题, 描述), ...]，同步和异步搜索共用
+    """
+    return extract_results(html)
+
+
 class SearchResult:
     """搜索结果类"""
     
@@ -115,55 +156,27 @@ def search(term, num_results=10, lang="en", proxy=None, advanced=False,
             resp = _req(term, num_results - start, lang, start, proxies, timeout, safe, ssl_verify, region)
             
             # 解析HTML
-            soup = BeautifulSoup(resp.text, "html.parser")
-            result_block = soup.find_all("div", class_="ezO2md")
             new_results = 0  # 跟踪本次迭代的新结果数
+            for link, title, description in _parse_results(resp.text):
+                # 检查链接是否已获取过，如果需要唯一结果
+                if link in fetched_links and unique:
+                    continue  # 如果链接不唯一则跳过此结果
 
-            logger.debug(f"找到 {len(result_block)} 个搜索结果块")
-
-            for result in result_block:
-                try:
-                    # 在结果块中查找链接标签
-                    link_tag = result.find("a", href=True)
-                    # 在链接标签中查找标题标签
-                    title_tag = link_tag.find("span", class_="CVA68e") if link_tag else None
-                    # 在结果块中查找描述标签
-                    description_tag = result.find("span", class_="FrIlee")
-
-                    # 检查是否找到所有必要的标签
-                    if link_tag and title_tag and description_tag:
-                        # 提取并解码链接URL
-                        link = unquote(link_tag["href"].split("&")[0].replace("/url?q=", "")) if link_tag else ""
-                        
-                        # 检查链接是否已获取过，如果需要唯一结果
-                        if link in fetched_links and unique:
-                            continue  # 如果链接不唯一则跳过此结果
-                        
-                        # 将链接添加到已获取链接集合
-                        fetched_links.add(link)
-                        
-                        # 提取标题文本
-                        title = title_tag.text if title_tag else ""
-                        # 提取描述文本
-                        description = description_tag.text if description_tag else ""
-                        
-                        # 增加获取结果计数
-                        fetched_results += 1
-                        # 增加本次迭代新结果计数
-                        new_results += 1
-                        
-                        # 根据advanced标志返回结果
-                        if advanced:
-                            yield SearchResult(link, title, description)  # 返回SearchResult对象
-                        else:
-                            yield link  # 只返回链接
-
-                        if fetched_results >= num_results:
-                            break  # 如果已获取所需数量的结果则停止
-                            
-                except Exception as e:
-                    logger.warning(f"解析搜索结果项失败: {e}")
-                    continue
+                # 将链接添加到已获取链接集合
+                fetched_links.add(link)
+                # 增加获取结果计数
+                fetched_results += 1
+                # 增加本次迭代新结果计数
+                new_results += 1
+
+                # 根据advanced标志返回结果
+                if advanced:
+                    yield SearchResult(link, title, description)  # 返回SearchResult对象
+                else:
+                    yield link  # 只返回链接
+
+                if fetched_results >= num_results:
+                    break  # 如果已获取所需数量的结果则停止
 
             if new_results == 0:
                 logger.warning(f"查询 '{term}' 只找到 {fetched_results} 个结果，需要 {num_results} 个结果")
@@ -180,6 +193,20 @@ def search(term, num_results=10, lang="en", proxy=None, advanced=False,
     logger.info(f"✅ Google搜索完成: {term} (获得{fetched_results}个结果)")
 
 
+def crypto_queries(token_symbol, token_ca):
+    """
+    加密货币信息搜索使用的查询词。
+    第一个查询只含代币符号，同符号的代币（PEPE、TRUMP等每天发行数百次）共享其搜索缓存；
+    第二个查询含mint地址，只针对该代币。
+    """
+    return [
+        f"${token_symbol} cryptocurrency",
+        f"${token_symbol}[{token_ca}] token pump.fun",
+        # f"${token_symbol}[{token_ca}] crypto project analysis",
+        # f"${token_symbol}[{token_ca}] meme coin review"
+    ]
+
+
 def search_crypto_info(token_symbol,token_ca,num_results=12):
     """
     专门用于加密货币信息搜索的便捷函数
@@ -192,12 +219,7 @@ def search_crypto_info(token_symbol,token_ca,num_results=12):
     Returns:
         List[SearchResult]: 搜索结果列表
     """
-    queries = [
-        f"${token_symbol}[{token_ca}] cryptocurrency",
-        f"${token_symbol}[{token_ca}] token pump.fun",
-        # f"${token_symbol}[{token_ca}] crypto project analysis",
-        # f"${token_symbol}[{token_ca}] meme coin review"
-    ]
+    queries = crypto_queries(token_symbol, token_ca)
     
     all_results = []
     
@@ -223,3 +245,188 @@ def search_crypto_info(token_symbol,token_ca,num_results=12):
             continue
     
     return all_results[:num_results]
+
+
+# ---------------------------------------------------------------------------
+# 异步版本：共享aiohttp连接池
+# ---------------------------------------------------------------------------
+
+def get_session():
+    """
+    获取全局aiohttp会话（需在事件循环中调用）。
+    连接池大小由SEARCH_POOL_SIZE配置，开启keep-alive和DNS缓存，避免每个结果页都重新建立TCP+TLS连接。
+    不保存响应中的Cookie（DummyCookieJar），每个请求只带固定的同意Cookie，与同步版 _req 一致，
+    避免所有并发搜索共用Google下发的同一个会话身份。
+    """
+    global _session
+    if _session is None or _session.closed:
+        import aiohttp
+
+        connector = aiohttp.TCPConnector(
+            limit=int(get_env_var("SEARCH_POOL_SIZE", "20")),
+            ttl_dns_cache=300,
+            keepalive_timeout=30,
+        )
+        _session = aiohttp.ClientSession(connector=connector, cookie_jar=aiohttp.DummyCookieJar())
+    return _session
+
+
+async def close_session():
+    """关闭全局aiohttp会话，应在应用关闭时调用"""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+async def _async_req(term, results, lang, start, proxy, timeout, safe, ssl_verify, region):
+    """发送异步Google搜索请求，返回HTML文本，受全局自适应限流器约束"""
+    import aiohttp
+
+    kwargs = {}
+    if ssl_verify is False:
+        kwargs["ssl"] = False
+    limiter = get_search_rate_limiter()
+    await limiter.acquire()
+    try:
+        async with get_session().get(
+            SEARCH_URL,
+            headers=_search_headers(),
+            params=_search_params(term, results, lang, start, safe, region),
+            proxy=proxy,
+            timeout=aiohttp.ClientTimeout(total=timeout),
+            cookies=SEARCH_COOKIES,
+            **kwargs,
+        ) as resp:
+            html = await resp.text()
+            throttled = is_throttled_response(resp.status, str(resp.url), html)
+            await limiter.report(throttled)
+            if throttled:
+                raise SearchThrottledError(f"Google限流 (HTTP {resp.status}): {resp.url}")
+            resp.raise_for_status()
+        logger.debug(f"Google搜索请求成功: {term}")
+        return html
+    except Exception as e:
+        logger.error(f"Google搜索请求失败: {e}")
+        raise
+
+
+async def async_search(term, num_results=10, lang="en", proxy=None, advanced=False,
+                       sleep_interval=0, timeout=5, safe="active", ssl_verify=None,
+                       region=None, start_num=0, unique=False, raise_errors=False):
+    """
+    search 的异步版本，参数相同，以异步生成器逐个产出结果，调用方可随时停止迭代。
+    aiohttp只支持HTTP代理，socks5代理会被忽略。
+    raise_errors为True时请求失败抛出异常，调用方可以区分"请求失败"和"没有结果"。
+
+    Yields:
+        SearchResult或str: 搜索结果
+    """
+    logger.info(f"🔍 开始Google搜索: {term} (需要{num_results}个结果)")
+
+    # 代理设置
+    if proxy and not proxy.startswith("http"):
+        logger.warning(f"⚠️ 异步搜索不支持该代理，已忽略: {proxy}")
+        proxy = None
+
+    start = start_num
+    fetched_results = 0  # 跟踪总获取结果数
+    fetched_links = set()  # 跟踪已见过的链接
+
+    while fetched_results < num_results:
+        try:
+            html = await _async_req(term, num_results - start, lang, start, proxy, timeout, safe, ssl_verify, region)
+        except Exception as e:
+            logger.error(f"搜索过程中出错: {e}")
+            if raise_errors:
+                raise
+            break
+
+        new_results = 0  # 跟踪本次迭代的新结果数
+        for link, title, description in _parse_results(html):
+            if link in fetched_links and unique:
+                continue
+            fetched_links.add(link)
+            fetched_results += 1
+            new_results += 1
+
+            yield SearchResult(link, title, description) if advanced else link
+
+            if fetched_results >= num_results:
+                break
+
+        if new_results == 0:
+            logger.warning(f"查询 '{term}' 只找到 {fetched_results} 个结果，需要 {num_results} 个结果")
+            break
+
+        start += 10  # 准备下一组结果
+        if sleep_interval > 0:
+            await asyncio.sleep(sleep_interval)
+
+    logger.info(f"✅ Google搜索完成: {term} (获得{fetched_results}个结果)")
+
+
+async def async_search_crypto_info(token_symbol, token_ca, num_results=12) -> List[SearchResult]:
+    """
+    search_crypto_info 的异步版本：所有查询并发发出（受全局速率限制约束），
+    结果按到达顺序合并并按URL去重，凑够 num_results 个后立即取消其余查询。
+    每个查询先查搜索缓存（见 backend/services/search_cache.py），未命中才请求Google
+
+    Returns:
+        List[SearchResult]: 搜索结果列表
+    """
+    queries = crypto_queries(token_symbol, token_ca)
+    results_queue: asyncio.Queue = asyncio.Queue()
+    cache = get_search_cache()
+
+    async def run_query(query):
+        try:
+            cached = await cache.get(query)
+            if cached is not None:
+                logger.info(f"🔍 搜索缓存命中: {query} ({len(cached)}个结果)")
+                for link, title, description in cached:
+                    results_queue.put_nowait(SearchResult(link, title, description))
+                return
+
+            fetched = []
+            # aclosing: 任务被取消时立即关闭生成器，不再发起后续翻页请求
+            async with aclosing(async_search(
+                query,
+                num_results=max(6, num_results // len(queries)),
+                lang='en',
+                advanced=True,
+                timeout=10,
+                safe='active',
+                unique=True,
+                raise_errors=True
+            )) as results:
+                async for result in results:
+                    fetched.append((result.url, result.title, result.description))
+                    await results_queue.put(result)
+            # 只缓存完整执行的查询；被取消或请求失败的查询结果不完整，不写入缓存
+            await cache.set(query, fetched, ttl=cache.mint_ttl if token_ca in query else cache.ttl)
+        except Exception as e:
+            logger.error(f"搜索查询 '{query}' 失败: {e}")
+        finally:
+            results_queue.put_nowait(None)  # 该查询结束
+
+    tasks = [asyncio.create_task(run_query(query)) for query in queries]
+    all_results = []
+    seen_urls = set()
+    finished = 0
+    try:
+        while finished < len(tasks) and len(all_results) < num_results:
+            result = await results_queue.get()
+            if result is None:
+                finished += 1
+                continue
+            if result.url in seen_urls:
+                continue
+            seen_urls.add(result.url)
+            all_results.append(result)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    return all_results
@@ -2,12 +2,13 @@ import asyncio
 import json
 import logging
 import os
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
 from datetime import datetime
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
+from websockets.exceptions import ConnectionClosedOK
 
 # 加载环境变量
 from dotenv import load_dotenv
@@ -16,9 +17,17 @@ load_dotenv()
 from backend.services.token_monitor import TokenMonitor
 from backend.services.ai_analyzer import AIAnalyzer
 from backend.services.message_queue import MessageQueue
-from backend.models.token import TokenData, AnalysisResult
+from backend.services.ingest_buffer import IngestBuffer
+from backend.services.keyword_model import get_keyword_model
+from backend.services.tag_analyzer import warmup as warmup_tag_analyzer
+from backend.services.translate import preseed_translation_cache
+from backend.services.translation_cache import get_translation_cache
+from backend.services.search_cache import get_search_cache
+from backend.services.rate_limiter import get_search_rate_limiter
+from backend.models.token import TokenData, TokenRecord, AnalysisResult
 from backend.utils.logger import setup_logger
 from backend.utils.env_loader import get_env_var
+from backend.utils.message_codec import encode_envelope, encode_json_array
 
 # 设置日志
 logger = setup_logger(__name__)
@@ -38,65 +47,137 @@ app.add_middleware(
 token_monitor: Optional[TokenMonitor] = None
 ai_analyzer: Optional[AIAnalyzer] = None
 message_queue: Optional[MessageQueue] = None
+ingest_buffer: Optional[IngestBuffer] = None
 
 # WebSocket连接管理
+# 慢客户端策略：丢弃该客户端队列中最旧的消息（降级），或直接断开该客户端
+SLOW_CLIENT_DROP_OLDEST = "drop_oldest"
+SLOW_CLIENT_DISCONNECT = "disconnect"
+
+class ClientConnection:
+    """单个WebSocket客户端：有界发送队列 + 独立写协程"""
+
+    def __init__(self, websocket: WebSocket, queue_size: int):
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.writer_task: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.dropped = 0
+
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
+    def __init__(self, queue_size: int = 256, slow_client_policy: str = SLOW_CLIENT_DROP_OLDEST):
+        self.active_connections: Dict[WebSocket, ClientConnection] = {}
+        self.queue_size = queue_size
+        self.slow_client_policy = slow_client_policy
+        # 统计信息
+        self.dropped_messages = 0
+        self.slow_disconnects = 0
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        client = ClientConnection(websocket, self.queue_size)
+        client.writer_task = asyncio.create_task(self._writer(client))
+        self.active_connections[websocket] = client
         logger.info(f"WebSocket连接已建立，当前连接数: {len(self.active_connections)}")
 
     def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
+        client = self.active_connections.pop(websocket, None)
+        if client and client.writer_task and client.writer_task is not asyncio.current_task():
+            client.writer_task.cancel()
         logger.info(f"WebSocket连接已断开，当前连接数: {len(self.active_connections)}")
 
-    async def send_personal_message(self, message: str, websocket: WebSocket):
+    def is_connected(self, websocket: WebSocket) -> bool:
+        return websocket in self.active_connections
+
+    async def _writer(self, client: ClientConnection):
+        """按顺序发送该客户端队列中的消息，一个慢客户端只阻塞自己的写协程"""
         try:
-            await websocket.send_text(message)
+            while True:
+                message = await client.queue.get()
+                await client.websocket.send_text(message)
+                client.sent += 1
+        except asyncio.CancelledError:
+            pass
+        except (WebSocketDisconnect, ConnectionClosedOK) as e:
+            # 客户端正常关闭连接，不是发送错误
+            logger.info(f"客户端已关闭连接，移除连接: {e}")
+            self.disconnect(client.websocket)
         except Exception as e:
-            logger.error(f"发送个人消息失败: {e}")
-            # 只有在连接真正断开时才移除，不要主动断开
-            if websocket in self.active_connections:
-                self.active_connections.remove(websocket)
+            logger.error(f"❌ 发送消息失败，移除连接: {e}")
+            self.disconnect(client.websocket)
+
+    def _enqueue(self, client: ClientConnection, message: str) -> bool:
+        """非阻塞入队，队列满时按慢客户端策略处理"""
+        try:
+            client.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        if self.slow_client_policy == SLOW_CLIENT_DISCONNECT:
+            self.slow_disconnects += 1
+            logger.warning(f"⚠️ 客户端发送队列已满 ({self.queue_size})，断开慢客户端")
+            self.disconnect(client.websocket)
+            asyncio.create_task(self._close_quietly(client.websocket))
+            return False
+
+        # 丢弃最旧的消息，保证客户端看到的是最新数据
+        client.queue.get_nowait()
+        client.queue.put_nowait(message)
+        client.dropped += 1
+        self.dropped_messages += 1
+        return True
+
+    async def _close_quietly(self, websocket: WebSocket):
+        try:
+            await websocket.close()
+        except Exception:
+            pass
+
+    async def send_personal_message(self, message: str, websocket: WebSocket):
+        client = self.active_connections.get(websocket)
+        if client:
+            self._enqueue(client, message)
 
     async def broadcast(self, message: str):
         if not self.active_connections:
             logger.warning("⚠️ 没有活跃的WebSocket连接，跳过广播")
             return
 
-        logger.info(f"📡 开始广播消息到 {len(self.active_connections)} 个连接")
-        logger.info(f"📡 广播内容: {message[:200]}{'...' if len(message) > 200 else ''}")
-
-        disconnected = []
-        success_count = 0
-
-        for i, connection in enumerate(self.active_connections):
-            try:
-                await connection.send_text(message)
-                success_count += 1
-                logger.info(f"✅ 成功发送到连接 #{i+1}")
-            except Exception as e:
-                logger.error(f"❌ 发送到连接 #{i+1} 失败: {e}")
-                # 标记为断开，但不主动关闭连接
-                disconnected.append(connection)
-
-        # 只清理真正断开的连接，不主动断开
-        for conn in disconnected:
-            if conn in self.active_connections:
-                self.active_connections.remove(conn)
-
-        logger.info(f"📡 广播完成: 成功 {success_count}/{len(self.active_connections) + len(disconnected)} 个连接")
+        # 只做非阻塞入队，实际发送由各客户端的写协程完成
+        queued = 0
+        for client in list(self.active_connections.values()):
+            if self._enqueue(client, message):
+                queued += 1
+
+        logger.info(f"📡 广播已入队: {queued}/{len(self.active_connections)} 个连接")
+
+    async def close_all(self):
+        """关闭所有连接和写协程"""
+        for websocket in list(self.active_connections):
+            self.disconnect(websocket)
+            await self._close_quietly(websocket)
+
+    def get_stats(self) -> Dict[str, Any]:
+        depths = [client.queue.qsize() for client in self.active_connections.values()]
+        return {
+            "connections": len(depths),
+            "queue_size": self.queue_size,
+            "slow_client_policy": self.slow_client_policy,
+            "max_queue_depth": max(depths, default=0),
+            "dropped_messages": self.dropped_messages,
+            "slow_disconnects": self.slow_disconnects,
+        }
 
-manager = ConnectionManager()
+manager = ConnectionManager(
+    queue_size=int(get_env_var("WS_CLIENT_QUEUE_SIZE", "256")),
+    slow_client_policy=get_env_var("WS_SLOW_CLIENT_POLICY", SLOW_CLIENT_DROP_OLDEST),
+)
 
 @app.on_event("startup")
 async def startup_event():
     """应用启动时初始化服务"""
-    global token_monitor, ai_analyzer, message_queue
+    global token_monitor, ai_analyzer, message_queue, ingest_buffer
     
     logger.info("正在启动AI Crypto Token Analysis服务...")
     
@@ -104,22 +185,42 @@ async def startup_event():
     message_queue = MessageQueue()
     await message_queue.initialize()
     
+    # 预热标签分析器：停用词、jieba词典、NLTK分词器和常驻内存的关键词模型
+    # 预热只是性能优化，失败（如缺少NLTK数据）时不阻止启动，首个分析任务会按需加载
+    try:
+        await asyncio.to_thread(warmup_tag_analyzer)
+    except Exception as e:
+        logger.warning(f"⚠️ 标签分析器预热失败，首次分析时再加载: {e}")
+
     # 初始化AI分析器 - 设置最大并发AI请求数
     max_concurrent_ai_requests = int(get_env_var("MAX_CONCURRENT_AI_REQUESTS", "3"))
-    ai_analyzer = AIAnalyzer(message_queue, max_concurrent_ai_requests)
+    analysis_workers = int(get_env_var("ANALYSIS_WORKERS", "4"))
+    ai_analyzer = AIAnalyzer(message_queue, max_concurrent_ai_requests, analysis_workers)
     await ai_analyzer.initialize()
     
+    # 初始化摄取缓冲区 - 监控器只负责写入，由独立任务消费
+    ingest_buffer = IngestBuffer(
+        capacity=int(get_env_var("INGEST_BUFFER_SIZE", "1024")),
+        overflow_policy=get_env_var("INGEST_OVERFLOW_POLICY", "drop_oldest"),
+    )
+
     # 初始化代币监控器
-    token_monitor = TokenMonitor(on_token_detected=handle_new_token)
+    token_monitor = TokenMonitor(on_tokens_detected=ingest_buffer.put_many)
     
     # 启动AI分析器的消费者
     asyncio.create_task(ai_analyzer.start_consumer())
 
+    # 启动摄取缓冲区消费任务
+    asyncio.create_task(consume_ingest_buffer())
+
     # 启动代币监控
     asyncio.create_task(token_monitor.start_monitoring())
 
     # 启动分析结果广播任务
     asyncio.create_task(broadcast_analysis_results())
+
+    # 后台预热翻译缓存，不阻塞启动
+    asyncio.create_task(preseed_translation_cache(int(get_env_var("TRANSLATION_PRESEED_SIZE", "500"))))
     
     logger.info("所有服务已成功启动")
 
@@ -136,56 +237,70 @@ async def shutdown_event():
     
     if message_queue:
         await message_queue.close()
+
+    await manager.close_all()
+
+    await asyncio.to_thread(get_translation_cache().close)
+    await get_search_cache().close()
+    await get_search_rate_limiter().close()
     
     logger.info("所有服务已关闭")
 
-async def handle_new_token(token_data: TokenData):
+async def handle_new_token(token_data: Union[TokenRecord, TokenData]):
     """处理新检测到的代币"""
-    logger.info(f"🪙 [START] handle_new_token 开始处理: {token_data.symbol}")
+    await handle_new_tokens([token_data])
 
-    try:
-        logger.info(f"🪙 检测到新代币: {token_data.symbol} ({token_data.name})")
-        logger.info(f"🪙 代币详情: mint={token_data.mint}, 总供应量={token_data.token_total_supply}")
-
-        # 立即向前端推送代币信息
-        logger.info(f"📤 [STEP 1] 准备创建代币消息: {token_data.symbol}")
-        token_message = {
-            "type": "new_token",
-            "data": token_data.to_json_dict(),  # 使用安全的JSON序列化方法
-            "timestamp": datetime.now().isoformat()
-        }
+async def handle_new_tokens(tokens: List[Union[TokenRecord, TokenData]]):
+    """处理同一条日志通知中检测到的一批新代币"""
+    if not tokens:
+        return
 
-        logger.info(f"📤 [STEP 2] 序列化消息: {token_data.symbol}")
-        token_json = json.dumps(token_message)
-        logger.info(f"📤 [STEP 3] 准备广播新代币消息: {token_data.symbol}")
-        logger.info(f"📤 消息内容: {token_json[:300]}{'...' if len(token_json) > 300 else ''}")
+    symbols = ", ".join(token_data.symbol for token_data in tokens)
+    logger.info(f"🪙 [START] handle_new_tokens 开始处理: {len(tokens)} 个代币 [{symbols}]")
 
-        logger.info(f"📤 [STEP 4] 调用manager.broadcast: {token_data.symbol}")
+    try:
+        for token_data in tokens:
+            logger.info(f"🪙 检测到新代币: {token_data.symbol} ({token_data.name})")
+            logger.info(f"🪙 代币详情: mint={token_data.mint}, 总供应量={token_data.token_total_supply}")
+
+        # 立即向前端推送代币信息，单个代币保持new_token格式，多个代币合并为一条new_tokens消息
+        # 代币JSON只编码一次，广播和入队复用同一份
+        logger.info(f"📤 [STEP 1] 准备编码代币消息: {symbols}")
+        if len(tokens) == 1:
+            token_json = encode_envelope("new_token", tokens[0].to_json())
+        else:
+            token_json = encode_envelope("new_tokens", encode_json_array(token_data.to_json() for token_data in tokens))
+        logger.debug(f"📤 消息内容: {token_json[:300]}{'...' if len(token_json) > 300 else ''}")
+
+        logger.info(f"📤 [STEP 2] 调用manager.broadcast: {symbols}")
         try:
             await manager.broadcast(token_json)
-            logger.info(f"📤 [STEP 5] 广播完成: {token_data.symbol}")
+            logger.info(f"📤 [STEP 3] 广播完成: {symbols}")
         except Exception as e:
             logger.error(f"❌ 广播失败: {e}")
-            logger.error(f"❌ 广播失败的代币: {token_data.symbol}")
+            logger.error(f"❌ 广播失败的代币: {symbols}")
             import traceback
             logger.error(f"❌ 错误详情: {traceback.format_exc()}")
 
         # 将代币添加到分析队列
-        logger.info(f"📝 [STEP 6] 准备添加到分析队列: {token_data.symbol}")
+        logger.info(f"📝 [STEP 4] 准备添加到分析队列: {symbols}")
         if message_queue:
-            logger.info(f"📝 将代币 {token_data.symbol} 添加到分析队列")
-            await message_queue.add_analysis_task(token_data)
+            await message_queue.add_analysis_tasks(tokens)
         else:
             logger.warning("⚠️ 消息队列不可用，跳过分析任务")
 
-        # logger.info(f"🪙 [END] handle_new_token 处理完成: {token_data.symbol}")
-
     except Exception as e:
-        logger.error(f"❌ handle_new_token 处理失败: {token_data.symbol}")
+        logger.error(f"❌ handle_new_tokens 处理失败: {symbols}")
         logger.error(f"❌ 错误: {e}")
         import traceback
         logger.error(f"❌ 完整错误: {traceback.format_exc()}")
 
+async def consume_ingest_buffer():
+    """从摄取缓冲区取出积压的代币并交给handle_new_tokens"""
+    while True:
+        tokens = await ingest_buffer.get_batch()
+        await handle_new_tokens(tokens)
+
 async def broadcast_analysis_results():
     """广播分析结果"""
     if not message_queue or not message_queue.redis_client:
@@ -238,7 +353,8 @@ async def websocket_endpoint(websocket: WebSocket):
             "timestamp": datetime.now().isoformat()
         }
         connection_json = json.dumps(connection_msg)
-        await websocket.send_text(connection_json)
+        # 所有发送都经过该客户端的发送队列，避免与广播并发写同一连接
+        await manager.send_personal_message(connection_json, websocket)
         logger.info(f"📤 发送连接确认消息到 {client_ip}: {connection_json}")
 
         while True:
@@ -249,26 +365,30 @@ async def websocket_endpoint(websocket: WebSocket):
 
                 # 处理客户端发送的消息
                 if data == "ping":
-                    await websocket.send_text("pong")
+                    await manager.send_personal_message("pong", websocket)
                     logger.info(f"📤 发送pong响应到 {client_ip}")
                 elif data == "heartbeat":
                     heartbeat_response = json.dumps({
                         "type": "heartbeat_response",
                         "timestamp": datetime.now().isoformat()
                     })
-                    await websocket.send_text(heartbeat_response)
+                    await manager.send_personal_message(heartbeat_response, websocket)
                     logger.info(f"📤 发送心跳响应到 {client_ip}: {heartbeat_response}")
                 else:
                     logger.warning(f"⚠️ 收到未知消息类型从 {client_ip}: {data}")
 
             except asyncio.TimeoutError:
+                # 写协程发送失败或慢客户端被断开时，连接已从管理器移除
+                if not manager.is_connected(websocket):
+                    logger.info(f"🔌 连接已被服务端移除: {client_ip}")
+                    break
                 # 发送心跳检查连接是否还活跃
                 try:
                     heartbeat_msg = json.dumps({
                         "type": "heartbeat",
                         "timestamp": datetime.now().isoformat()
                     })
-                    await websocket.send_text(heartbeat_msg)
+                    await manager.send_personal_message(heartbeat_msg, websocket)
                     logger.info(f"💓 发送心跳到 {client_ip}: {heartbeat_msg}")
                 except Exception as e:
                     logger.error(f"❌ 发送心跳失败到 {client_ip}: {e}")
@@ -300,6 +420,14 @@ async def get_status():
         "ai_analyzer": "running" if ai_analyzer else "stopped",
         "message_queue": "running" if message_queue else "stopped",
         "active_connections": len(manager.active_connections),
+        "websocket": manager.get_stats(),
+        "token_monitor_stats": token_monitor.get_stats() if token_monitor else None,
+        "ingest_buffer": ingest_buffer.get_stats() if ingest_buffer else None,
+        "ai_workers": ai_analyzer.get_worker_stats() if ai_analyzer else None,
+        "keyword_model": get_keyword_model().get_stats(),
+        "translation_cache": get_translation_cache().get_stats(),
+        "search_cache": get_search_cache().get_stats(),
+        "search_rate_limiter": get_search_rate_limiter().get_stats(),
         "timestamp": datetime.now().isoformat()
     }
 
@@ -1,9 +1,11 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 from pydantic import BaseModel
 import json
 
+from backend.utils.message_codec import dumps
+
 @dataclass
 class CreateEvent:
     """原始的代币创建事件数据"""
@@ -20,6 +22,76 @@ class CreateEvent:
     real_token_reserves: int
     token_total_supply: int
 
+@dataclass(slots=True)
+class TokenRecord:
+    """摄取/广播热路径上的轻量代币数据，仅在API边界转换为TokenData"""
+    name: str
+    symbol: str
+    uri: str
+    mint: str
+    bonding_curve: str
+    user: str
+    creator: str
+    timestamp: int
+    virtual_token_reserves: float
+    virtual_sol_reserves: float
+    real_token_reserves: float
+    token_total_supply: float
+    created_at: str
+    market_cap: Optional[float] = None
+    price_usd: Optional[float] = None
+    # 缓存的JSON编码，广播和入队共用
+    _json: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    @classmethod
+    def from_create_event(cls, event: CreateEvent) -> "TokenRecord":
+        """由CreateEvent换算储备单位并记录检测时间"""
+        return cls(
+            name=event.name,
+            symbol=event.symbol,
+            uri=event.uri,
+            mint=event.mint,
+            bonding_curve=event.bonding_curve,
+            user=event.user,
+            creator=event.creator,
+            timestamp=event.timestamp,
+            virtual_token_reserves=event.virtual_token_reserves / 1e6,
+            virtual_sol_reserves=event.virtual_sol_reserves / 1e9,
+            real_token_reserves=event.real_token_reserves / 1e6,
+            token_total_supply=event.token_total_supply / 1e6,
+            created_at=datetime.now().isoformat(timespec="seconds"),
+        )
+
+    def to_json_dict(self) -> dict:
+        """与TokenData.to_json_dict相同字段的字典"""
+        return {
+            "name": self.name,
+            "symbol": self.symbol,
+            "uri": self.uri,
+            "mint": self.mint,
+            "bonding_curve": self.bonding_curve,
+            "user": self.user,
+            "creator": self.creator,
+            "timestamp": self.timestamp,
+            "virtual_token_reserves": self.virtual_token_reserves,
+            "virtual_sol_reserves": self.virtual_sol_reserves,
+            "real_token_reserves": self.real_token_reserves,
+            "token_total_supply": self.token_total_supply,
+            "market_cap": self.market_cap,
+            "price_usd": self.price_usd,
+            "created_at": self.created_at,
+        }
+
+    def to_json(self) -> str:
+        """编码为JSON字符串，只编码一次"""
+        if self._json is None:
+            self._json = dumps(self.to_json_dict())
+        return self._json
+
+    def to_model(self) -> "TokenData":
+        """转换为pydantic模型（API边界使用）"""
+        return TokenData(**self.to_json_dict())
+
 class TokenData(BaseModel):
     """处理后的代币数据"""
     name: str
@@ -49,6 +121,10 @@ class TokenData(BaseModel):
         """安全的JSON序列化方法"""
         return self.model_dump(mode='json')
 
+    def to_json(self) -> str:
+        """编码为JSON字符串"""
+        return self.model_dump_json()
+
 class RiskLevel(BaseModel):
     """风险等级"""
     level: str  # "LOW", "MEDIUM", "HIGH", "CRITICAL"
@@ -128,6 +204,10 @@ class AnalysisResult(BaseModel):
         """安全的JSON序列化方法"""
         return self.model_dump(mode='json')
 
+    def to_json(self) -> str:
+        """编码为JSON字符串"""
+        return self.model_dump_json()
+
 class StreamMessage(BaseModel):
     """流式消息格式"""
     type: str  # "new_token", "analysis_update", "analysis_complete", "error"
@@ -0,0 +1,162 @@
+"""
+Google结果页（SERP）解析
+同一套提取规则（结果块 div.ezO2md / 标题 span.CVA68e / 描述 span.FrIlee）有三种实现：
+selectolax（最快）、lxml、BeautifulSoup（兜底），按可用性自动选择，也可用 SERP_PARSER 指定
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import unquote
+
+from backend.utils.logger import setup_logger
+from backend.utils.env_loader import get_env_var
+
+logger = setup_logger(__name__)
+
+RESULT_CLASS = "ezO2md"
+TITLE_CLASS = "CVA68e"
+DESCRIPTION_CLASS = "FrIlee"
+
+# (链接, 标题, 描述)
+SerpResult = Tuple[str, str, str]
+
+
+def clean_link(href: str) -> str:
+    """去掉Google跳转前缀和跟踪参数，并解码URL"""
+    return unquote(href.split("&")[0].replace("/url?q=", ""))
+
+
+def extract_with_bs4(html: str) -> List[SerpResult]:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    result_block = soup.find_all("div", class_=RESULT_CLASS)
+    logger.debug(f"找到 {len(result_block)} 个搜索结果块")
+
+    parsed = []
+    for result in result_block:
+        try:
+            # 在结果块中查找链接标签
+            link_tag = result.find("a", href=True)
+            # 在链接标签中查找标题标签
+            title_tag = link_tag.find("span", class_=TITLE_CLASS) if link_tag else None
+            # 在结果块中查找描述标签
+            description_tag = result.find("span", class_=DESCRIPTION_CLASS)
+
+            # 检查是否找到所有必要的标签
+            if link_tag and title_tag and description_tag:
+                parsed.append((clean_link(link_tag["href"]), title_tag.text, description_tag.text))
+        except Exception as e:
+            logger.warning(f"解析搜索结果项失败: {e}")
+            continue
+    return parsed
+
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+_LXML_RESULT_XPATH = f"//div[{_has_class(RESULT_CLASS)}]"
+_LXML_LINK_XPATH = ".//a[@href]"
+_LXML_TITLE_XPATH = f".//span[{_has_class(TITLE_CLASS)}]"
+_LXML_DESCRIPTION_XPATH = f".//span[{_has_class(DESCRIPTION_CLASS)}]"
+
+
+def extract_with_lxml(html: str) -> List[SerpResult]:
+    import lxml.html
+    from lxml.etree import ParserError
+
+    try:
+        root = lxml.html.fromstring(html)
+    except ParserError:
+        return []  # 空文档
+
+    parsed = []
+    for result in root.xpath(_LXML_RESULT_XPATH):
+        try:
+            links = result.xpath(_LXML_LINK_XPATH)
+            titles = links[0].xpath(_LXML_TITLE_XPATH) if links else []
+            descriptions = result.xpath(_LXML_DESCRIPTION_XPATH)
+            if links and titles and descriptions:
+                parsed.append((clean_link(links[0].get("href")), titles[0].text_content(), descriptions[0].text_content()))
+        except Exception as e:
+            logger.warning(f"解析搜索结果项失败: {e}")
+            continue
+    return parsed
+
+
+def _selectolax_parser():
+    try:
+        from selectolax.lexbor import LexborHTMLParser
+        return LexborHTMLParser
+    except ImportError:
+        from selectolax.parser import HTMLParser  # selectolax < 1.0
+        return HTMLParser
+
+
+def extract_with_selectolax(html: str) -> List[SerpResult]:
+    tree = _selectolax_parser()(html)
+
+    parsed = []
+    for result in tree.css(f"div.{RESULT_CLASS}"):
+        try:
+            link_tag = result.css_first("a[href]")
+            title_tag = link_tag.css_first(f"span.{TITLE_CLASS}") if link_tag is not None else None
+            description_tag = result.css_first(f"span.{DESCRIPTION_CLASS}")
+            if link_tag is not None and title_tag is not None and description_tag is not None:
+                parsed.append((clean_link(link_tag.attributes.get("href") or ""), title_tag.text(), description_tag.text()))
+        except Exception as e:
+            logger.warning(f"解析搜索结果项失败: {e}")
+            continue
+    return parsed
+
+
+# 按速度从快到慢排列，自动选择时取第一个可用的
+EXTRACTORS: Dict[str, Callable[[str], List[SerpResult]]] = {
+    "selectolax": extract_with_selectolax,
+    "lxml": extract_with_lxml,
+    "bs4": extract_with_bs4,
+}
+
+
+def is_available(name: str) -> bool:
+    """解析后端的依赖是否已安装"""
+    try:
+        if name == "selectolax":
+            _selectolax_parser()
+        elif name == "lxml":
+            import lxml.html  # noqa: F401
+        elif name == "bs4":
+            import bs4  # noqa: F401
+        else:
+            return False
+    except ImportError:
+        return False
+    return True
+
+
+def available_extractors() -> List[str]:
+    return [name for name in EXTRACTORS if is_available(name)]
+
+
+_extractor: Optional[Callable[[str], List[SerpResult]]] = None
+
+
+def get_extractor() -> Callable[[str], List[SerpResult]]:
+    """获取当前使用的解析函数：SERP_PARSER=auto（默认）时选择最快的可用后端"""
+    global _extractor
+    if _extractor is None:
+        name = get_env_var("SERP_PARSER", "auto")
+        if name == "auto":
+            available = available_extractors()
+            name = available[0] if available else "bs4"
+        elif name not in EXTRACTORS or not is_available(name):
+            logger.warning(f"⚠️ SERP解析后端 {name} 不可用，使用bs4")
+            name = "bs4"
+        logger.info(f"SERP解析后端: {name}")
+        _extractor = EXTRACTORS[name]
+    return _extractor
+
+
+def extract_results(html: str) -> List[SerpResult]:
+    """解析Google结果页，返回 [(链接, 标题, 描述), ...]"""
+    return get_extractor()(html)
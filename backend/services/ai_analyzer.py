@@ -2,7 +2,8 @@ import asyncio
 import json
 import os
 import sys
-from typing import Optional, List, Dict, Any
+import time
+from typing import Optional, List, Dict, Any, Callable
 from datetime import datetime
 import aiohttp
 import google.generativeai as genai
@@ -14,7 +15,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'google_crawl'))
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'tag_analyzer'))
 
 
-from backend.services.tag_analyzer import extract_crypto_tag
+from backend.services.tag_analyzer import extract_crypto_tags
 from backend.services.translate import translate_english
 from backend.models.token import TokenData, AnalysisResult, NarrativeAnalysis, RiskLevel, MarketAnalysis, WebSearchResult,SimpleAnalysisResult
 from backend.services.message_queue import MessageQueue
@@ -23,7 +24,7 @@ from backend.utils.env_loader import get_env_var
 # uvicorn backend.main:app --host 0.0.0.0 --port 8000 --reload
 # 导入高效Google搜索引擎
 try:
-    from backend.google_engine import search_crypto_info, SearchResult
+    from backend.google_engine import async_search_crypto_info, close_session as close_search_session, SearchResult
     GOOGLE_ENGINE_AVAILABLE = True
     logger = setup_logger(__name__)
     logger.info("✅ 高效Google搜索引擎已加载")
@@ -37,11 +38,25 @@ logger = setup_logger(__name__)
 class AIAnalyzer:
     """AI分析服务，使用Gemini进行代币分析"""
 
-    def __init__(self, message_queue: MessageQueue, max_concurrent_ai_requests: int = 1):
+    def __init__(self, message_queue: MessageQueue, max_concurrent_ai_requests: int = 1, num_workers: int = 4):
         self.message_queue = message_queue
         self.is_running = False
         self.gemini_model = None
 
+        # 固定大小的工作协程池，限制同时进行的分析任务（搜索、推特、Gemini）数量
+        self.num_workers = num_workers
+        self.workers: List[asyncio.Task] = []
+        self.worker_stats: Dict[int, Dict[str, Any]] = {}
+        self.drain_timeout = 60.0  # stop()时等待进行中任务完成的最长时间
+        self._workers_started_at = 0.0
+
+        # 单个代币分析流程中各阶段的超时（秒）
+        self.stage_timeouts = {
+            "search": float(get_env_var("SEARCH_STAGE_TIMEOUT", "20")),
+            "tweets": float(get_env_var("TWEET_STAGE_TIMEOUT", "15")),
+            "ai": float(get_env_var("AI_STAGE_TIMEOUT", "90")),
+        }
+
         # AI并发控制
         self.max_concurrent_ai_requests = max_concurrent_ai_requests
         self.ai_semaphore = asyncio.Semaphore(max_concurrent_ai_requests)
@@ -53,7 +68,7 @@ class AIAnalyzer:
         self.completed_requests = 0
         self.failed_requests = 0
 
-        logger.info(f"AI分析器初始化，最大并发AI请求数: {max_concurrent_ai_requests}")
+        logger.info(f"AI分析器初始化，最大并发AI请求数: {max_concurrent_ai_requests}，工作协程数: {num_workers}")
         # 不再需要Google API密钥，使用高效爬虫
         
     async def initialize(self):
@@ -108,27 +123,83 @@ class AIAnalyzer:
                     self.active_ai_requests -= 1
         
     async def start_consumer(self):
-        """启动消费者，处理分析任务"""
+        """启动消费者，由固定数量的工作协程从队列拉取分析任务"""
         self.is_running = True
-        logger.info("AI分析消费者已启动")
-        
+        self._workers_started_at = time.monotonic()
+        self.workers = [asyncio.create_task(self._worker(worker_id)) for worker_id in range(self.num_workers)]
+        logger.info(f"AI分析消费者已启动，工作协程数: {self.num_workers}")
+        await asyncio.gather(*self.workers, return_exceptions=True)
+
+    async def _worker(self, worker_id: int):
+        """工作协程：一次只处理一个任务，处理完再拉取下一个"""
+        stats = self.worker_stats[worker_id] = {
+            "processed": 0,
+            "failed": 0,
+            "busy_seconds": 0.0,
+            "current": None,
+        }
+
         while self.is_running:
             try:
                 task = await self.message_queue.get_analysis_task()
-                if task:
-                    # 异步处理分析任务
-                    asyncio.create_task(self._process_analysis_task(task))
-                else:
-                    # 没有任务时短暂休眠
-                    await asyncio.sleep(0.1)
             except Exception as e:
-                logger.error(f"消费者处理任务时出错: {e}")
+                logger.error(f"工作协程 #{worker_id} 获取任务时出错: {e}")
                 await asyncio.sleep(1)
+                continue
+
+            if not task:
+                # 没有任务时短暂休眠
+                await asyncio.sleep(0.1)
+                continue
+
+            stats["current"] = task.get("task_id")
+            started = time.monotonic()
+            try:
+                await self._process_analysis_task(task)
+            except Exception as e:
+                stats["failed"] += 1
+                logger.error(f"工作协程 #{worker_id} 处理任务时出错: {e}")
+            finally:
+                stats["processed"] += 1
+                stats["busy_seconds"] += time.monotonic() - started
+                stats["current"] = None
+
+        logger.info(f"工作协程 #{worker_id} 已退出")
                 
     async def stop(self):
-        """停止AI分析服务"""
+        """停止AI分析服务，等待进行中的任务完成"""
         self.is_running = False
+
+        pending = [worker for worker in self.workers if not worker.done()]
+        if pending:
+            logger.info(f"等待 {len(pending)} 个工作协程完成当前任务 (最长 {self.drain_timeout}s)...")
+            _, still_running = await asyncio.wait(pending, timeout=self.drain_timeout)
+            for worker in still_running:
+                worker.cancel()
+            if still_running:
+                logger.warning(f"⚠️ {len(still_running)} 个工作协程超时，已取消")
+
+        if GOOGLE_ENGINE_AVAILABLE:
+            await close_search_session()
+
         logger.info("AI分析服务已停止")
+
+    def get_worker_stats(self) -> Dict[str, Any]:
+        """工作协程池的利用率统计"""
+        elapsed = max(time.monotonic() - self._workers_started_at, 1e-9) if self._workers_started_at else 0.0
+        workers = {}
+        for worker_id, stats in self.worker_stats.items():
+            workers[worker_id] = {
+                **stats,
+                "busy_seconds": round(stats["busy_seconds"], 3),
+                "utilization": round(stats["busy_seconds"] / elapsed, 4) if elapsed else 0.0,
+            }
+        busy = sum(1 for stats in self.worker_stats.values() if stats["current"])
+        return {
+            "num_workers": self.num_workers,
+            "busy_workers": busy,
+            "workers": workers,
+        }
         
     async def _process_analysis_task(self, task: Dict[str, Any]):
         """处理单个分析任务"""
@@ -148,16 +219,27 @@ class AIAnalyzer:
                 token_data.mint, 10.0, "ANALYZING"
             )
             
-            # 1. 网络搜索
-            search_results = await self._search_token_info(token_data)
-            await self.message_queue.update_analysis_progress(token_data.mint, 30.0)
-
-            # 2. 推文分析
-            tweet_analysis = await self._analyze_tweets(token_data)
+            # 1+2. 网络搜索和推文分析互不依赖，并行执行，各自带超时和降级结果
+            search_results, tweet_analysis = await asyncio.gather(
+                self._run_stage(
+                    "search",
+                    self._search_token_info(token_data),
+                    fallback=lambda: self._simple_search(token_data),
+                ),
+                self._run_stage(
+                    "tweets",
+                    self._analyze_tweets(token_data),
+                    fallback=lambda: [],
+                ),
+            )
             await self.message_queue.update_analysis_progress(token_data.mint, 50.0)
 
             # 3. 简单分析
-            simple_analysis = await self._ai_analyze_simple(token_data,search_results,tweet_analysis)
+            simple_analysis = await self._run_stage(
+                "ai",
+                self._ai_analyze_simple(token_data,search_results,tweet_analysis),
+                fallback=self._failed_simple_analysis,
+            )
             
             # 3. 叙事分析
             # narrative_analysis = await self._analyze_narrative(token_data, search_results)
@@ -198,6 +280,13 @@ class AIAnalyzer:
             #     investment_recommendation=investment_recommendation,
             #     analysis_completed_at=datetime.now()
             # )
+            # 四个字段的标签一次批量提取，共享模型加载和关键词翻译
+            narrative_tags, market_tags, ai_tags, investment_tags = await extract_crypto_tags([
+                simple_analysis.narrative_analysis,
+                simple_analysis.market_analysis,
+                simple_analysis.ai_summary,
+                simple_analysis.investment_recommendation,
+            ])
             analysis_result = AnalysisResult(
                 token_mint=token_data.mint,
                 token_symbol=token_data.symbol,
@@ -205,16 +294,16 @@ class AIAnalyzer:
                 status="COMPLETED",
                 progress=100.0,
                 narrative_analysis=simple_analysis.narrative_analysis,
-                narrative_tag=",".join(set(await extract_crypto_tag(simple_analysis.narrative_analysis))),
+                narrative_tag=",".join(set(narrative_tags)),
                 risk_assessment=simple_analysis.risk_assessment,
                 market_analysis=simple_analysis.market_analysis,
-                market_tag=",".join(set(await extract_crypto_tag(simple_analysis.market_analysis))),      
+                market_tag=",".join(set(market_tags)),      
                 web_search_results=search_results,
                 tweet_result=[{"content":tweet_analyse['content'] if len(tweet_analyse['content'])<100 else tweet_analyse['content'][:100]+"...","link":tweet_analyse["t_url"]} for tweet_analyse in tweet_analysis],
                 ai_summary=simple_analysis.ai_summary,
-                ai_tag=",".join(set(await extract_crypto_tag(simple_analysis.ai_summary))),
+                ai_tag=",".join(set(ai_tags)),
                 investment_recommendation=simple_analysis.investment_recommendation,
-                investment_tag=",".join(set(await extract_crypto_tag(simple_analysis.investment_recommendation))),
+                investment_tag=",".join(set(investment_tags)),
                 analysis_completed_at=datetime.now()
             )
             
@@ -225,6 +314,30 @@ class AIAnalyzer:
             logger.error(f"分析代币 {token_data.symbol} 时出错: {e}")
             await self.message_queue.fail_analysis(token_data.mint, str(e))
             
+    async def _run_stage(self, name: str, coro, fallback: Callable[[], Any]):
+        """
+        运行单个分析阶段，超时或出错时使用降级结果
+
+        Args:
+            name: 阶段名称，对应stage_timeouts中的超时配置
+            coro: 阶段协程
+            fallback: 返回降级结果的函数，可以返回协程
+        """
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(coro, timeout=self.stage_timeouts[name])
+            logger.info(f"⏱️ 阶段 {name} 完成，耗时 {time.monotonic() - started:.2f}s")
+            return result
+        except asyncio.TimeoutError:
+            logger.warning(f"⚠️ 阶段 {name} 超时 ({self.stage_timeouts[name]}s)，使用降级结果")
+        except Exception as e:
+            logger.error(f"阶段 {name} 失败，使用降级结果: {e}")
+
+        result = fallback()
+        if asyncio.iscoroutine(result):
+            result = await result
+        return result
+
     async def _analyze_tweets(self, token_data:TokenData) -> List[Dict[str,Any]]:
         def search_tweet(reqBody) -> List[Dict[str,Any]]:
             data = requests.post(self.tweet_endpoint,json=reqBody)
@@ -263,14 +376,11 @@ class AIAnalyzer:
             try:
                 logger.info(f"🔍 使用高效Google搜索引擎搜索: {token_data.symbol}")
 
-                # 使用异步方式运行同步的搜索函数
-                loop = asyncio.get_event_loop()
-                search_results = await loop.run_in_executor(
-                    None,
-                    search_crypto_info,
+                # 异步搜索，复用全局连接池，不再占用默认线程池
+                search_results = await async_search_crypto_info(
                     token_data.symbol,
                     token_data.mint,
-                    6  # 获取12个结果
+                    6  # 获取6个结果
                 )
 
                 logger.info(f"✅ Google搜索获得 {len(search_results)} 个结果")
@@ -420,13 +530,18 @@ class AIAnalyzer:
             return SimpleAnalysisResult(**result_data)
         except Exception as e:
             logger.error(f"_ai_analyze_simple error {e}")
-            return SimpleAnalysisResult(
-                narrative_analysis="叙事分析失败",
-                risk_assessment="风险评估失败",
-                market_analysis="市场分析失败",
-                ai_summary="AI总结失败",
-                investment_recommendation="投资建议失败"
-            )
+            return self._failed_simple_analysis()
+
+    @staticmethod
+    def _failed_simple_analysis() -> SimpleAnalysisResult:
+        """AI分析失败或超时时的降级结果"""
+        return SimpleAnalysisResult(
+            narrative_analysis="叙事分析失败",
+            risk_assessment="风险评估失败",
+            market_analysis="市场分析失败",
+            ai_summary="AI总结失败",
+            investment_recommendation="投资建议失败"
+        )
 
 
         
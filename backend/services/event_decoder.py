@@ -0,0 +1,114 @@
+"""
+pump.fun CreateEvent 解码器
+直接在 base64 解码后的缓冲区(memoryview)上解析，避免 hex 往返和逐字段闭包
+"""
+
+import base64
+import binascii
+import struct
+from typing import Iterable, Iterator
+
+from backend.models.token import CreateEvent
+from backend.utils.logger import setup_logger
+from backend.utils.pubkey import encode_pubkey, encode_pubkey_cached
+
+logger = setup_logger(__name__)
+
+# 8字节discriminator + 3×4字节长度 + 4×32字节公钥 + 5×8字节整数 = 188字节
+MIN_CREATE_EVENT_SIZE = 188
+
+_PROGRAM_DATA_PREFIX = "Program data: "
+# vdt/开头的是其他事件（如交易事件），不是CreateEvent结构
+_SKIP_PREFIX = "Program data: vdt/"
+_DISCRIMINATOR_SIZE = 8
+_U32 = struct.Struct("<I")
+# 定长尾部：mint, bonding_curve, user, creator, timestamp(i64), 4×u64
+_TAIL = struct.Struct("<32s32s32s32sqQQQQ")
+
+
+def _read_string(view: memoryview, offset: int):
+    """读取u32长度前缀的utf-8字符串，返回(字符串, 新偏移)"""
+    if offset + 4 > len(view):
+        raise ValueError("字符串长度数据不足")
+    (length,) = _U32.unpack_from(view, offset)
+    offset += 4
+    end = offset + length
+    if end > len(view):
+        raise ValueError(f"无效的字符串长度 {length}")
+    return str(view[offset:end], "utf-8", "replace").rstrip("\x00"), end
+
+
+def decode_create_event(data) -> CreateEvent:
+    """
+    解析CreateEvent
+
+    Args:
+        data: base64解码后的原始字节（bytes/bytearray/memoryview）
+
+    Returns:
+        CreateEvent: 解析后的事件
+
+    Raises:
+        ValueError: 数据长度不足或字段非法
+    """
+    view = memoryview(data)
+    offset = _DISCRIMINATOR_SIZE
+
+    name, offset = _read_string(view, offset)
+    symbol, offset = _read_string(view, offset)
+    uri, offset = _read_string(view, offset)
+
+    if offset + _TAIL.size > len(view):
+        raise ValueError("公钥/数值数据不足")
+    (
+        mint,
+        bonding_curve,
+        user,
+        creator,
+        timestamp,
+        virtual_token_reserves,
+        virtual_sol_reserves,
+        real_token_reserves,
+        token_total_supply,
+    ) = _TAIL.unpack_from(view, offset)
+
+    return CreateEvent(
+        name=name,
+        symbol=symbol,
+        uri=uri,
+        # mint和bonding_curve每个事件都不同，缓存只会挤占creator/user的条目
+        mint=encode_pubkey(mint),
+        bonding_curve=encode_pubkey(bonding_curve),
+        user=encode_pubkey_cached(user),
+        creator=encode_pubkey_cached(creator),
+        timestamp=timestamp,
+        virtual_token_reserves=virtual_token_reserves,
+        virtual_sol_reserves=virtual_sol_reserves,
+        real_token_reserves=real_token_reserves,
+        token_total_supply=token_total_supply,
+    )
+
+
+def iter_create_events(logs: Iterable[str]) -> Iterator[CreateEvent]:
+    """
+    一次遍历日志，逐个产出其中所有的CreateEvent
+
+    同一笔交易可能打包多个代币创建，解析失败的条目会被跳过而不会中断后续条目
+    """
+    for entry in logs:
+        if not entry.startswith(_PROGRAM_DATA_PREFIX) or entry.startswith(_SKIP_PREFIX):
+            continue
+
+        try:
+            raw = base64.b64decode(entry[len(_PROGRAM_DATA_PREFIX):])
+        except (binascii.Error, ValueError) as e:
+            logger.error(f"Base64解码错误: {e}")
+            continue
+
+        if len(raw) < MIN_CREATE_EVENT_SIZE:
+            continue
+
+        try:
+            yield decode_create_event(raw)
+        except ValueError as e:
+            logger.error(f"解析CreateEvent数据错误: {e}")
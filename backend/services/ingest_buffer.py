@@ -0,0 +1,124 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List
+
+from backend.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 溢出策略
+DROP_OLDEST = "drop_oldest"  # 丢弃最旧的代币，保证新代币尽快展示
+DROP_NEWEST = "drop_newest"  # 丢弃新到达的代币
+BLOCK = "block"  # 阻塞生产者（TokenMonitor停止读取，背压传到WebSocket）
+OVERFLOW_POLICIES = (DROP_OLDEST, DROP_NEWEST, BLOCK)
+
+
+class IngestBuffer:
+    """TokenMonitor与handle_new_tokens之间的定长缓冲区，带背压和统计指标"""
+
+    def __init__(self, capacity: int = 1024, overflow_policy: str = DROP_OLDEST):
+        if capacity <= 0:
+            raise ValueError(f"缓冲区容量必须大于0: {capacity}")
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"未知的溢出策略: {overflow_policy}，可选: {', '.join(OVERFLOW_POLICIES)}")
+
+        self.capacity = capacity
+        self.overflow_policy = overflow_policy
+        self._items: Deque[Any] = deque()
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+
+        # 统计信息
+        self.enqueued = 0
+        self.dequeued = 0
+        self.dropped_oldest = 0
+        self.dropped_newest = 0
+        self.blocked_puts = 0
+        self.max_depth = 0
+        self._put_calls = 0
+        self._enqueue_latency_total = 0.0
+        self._enqueue_latency_max = 0.0
+
+        logger.info(f"摄取缓冲区初始化，容量: {capacity}，溢出策略: {overflow_policy}")
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    async def put_many(self, items: Iterable[Any]):
+        """批量写入，缓冲区满时按溢出策略处理"""
+        start = time.perf_counter()
+        blocked = False
+
+        for item in items:
+            if len(self._items) >= self.capacity:
+                if self.overflow_policy == DROP_NEWEST:
+                    self.dropped_newest += 1
+                    continue
+                if self.overflow_policy == DROP_OLDEST:
+                    self._items.popleft()
+                    self.dropped_oldest += 1
+                else:
+                    if not blocked:
+                        blocked = True
+                        self.blocked_puts += 1
+                    # 等待前先唤醒消费者，否则消费者不知道已写入的元素，双方互相等待
+                    if len(self._items) > self.max_depth:
+                        self.max_depth = len(self._items)
+                    self._not_empty.set()
+                    while len(self._items) >= self.capacity:
+                        self._not_full.clear()
+                        await self._not_full.wait()
+
+            self._items.append(item)
+            self.enqueued += 1
+
+        depth = len(self._items)
+        if depth > self.max_depth:
+            self.max_depth = depth
+        if depth:
+            self._not_empty.set()
+
+        latency = time.perf_counter() - start
+        self._put_calls += 1
+        self._enqueue_latency_total += latency
+        if latency > self._enqueue_latency_max:
+            self._enqueue_latency_max = latency
+
+        dropped = self.dropped_oldest + self.dropped_newest
+        if dropped and depth >= self.capacity:
+            logger.warning(f"⚠️ 摄取缓冲区已满 ({depth}/{self.capacity})，累计丢弃 {dropped} 个代币")
+
+    async def put(self, item: Any):
+        """写入单个元素"""
+        await self.put_many((item,))
+
+    async def get_batch(self, max_items: int = 64) -> List[Any]:
+        """等待并取出当前积压的元素（最多max_items个）"""
+        while not self._items:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+
+        batch = []
+        while self._items and len(batch) < max_items:
+            batch.append(self._items.popleft())
+        self.dequeued += len(batch)
+        self._not_full.set()
+        return batch
+
+    def get_stats(self) -> Dict[str, Any]:
+        """导出缓冲区指标"""
+        return {
+            "capacity": self.capacity,
+            "overflow_policy": self.overflow_policy,
+            "depth": len(self._items),
+            "max_depth": self.max_depth,
+            "enqueued": self.enqueued,
+            "dequeued": self.dequeued,
+            "dropped_oldest": self.dropped_oldest,
+            "dropped_newest": self.dropped_newest,
+            "blocked_puts": self.blocked_puts,
+            "avg_enqueue_latency_ms": (self._enqueue_latency_total / self._put_calls * 1000) if self._put_calls else 0.0,
+            "max_enqueue_latency_ms": self._enqueue_latency_max * 1000,
+        }
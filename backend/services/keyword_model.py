@@ -0,0 +1,135 @@
+import os
+import pickle
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from backend.utils.logger import setup_logger
+from backend.utils.env_loader import get_env_var
+
+logger = setup_logger(__name__)
+
+# 与训练脚本 init/tokenization_alg/train_tf_idf.py 的默认输出为同一个文件，重新训练后自动热加载
+DEFAULT_MODEL_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "init", "tokenization_alg", "keyword_model.pkl",
+)
+
+
+def parse_keyword_model(obj: Any) -> Tuple[Dict[str, int], Dict[str, float], float, int]:
+    """
+    解析pickle中的关键词模型，返回 (word_freq, idf, default_idf, n_docs)。
+
+    新格式为 train_tf_idf.py 生成的字典 {"word_freq", "idf", "default_idf", "n_docs"}；
+    旧格式只有词频Counter，此时所有词IDF均为1，评分结果与旧版单文档TF-IDF一致。
+    """
+    if isinstance(obj, dict) and "word_freq" in obj and "idf" in obj:
+        return obj["word_freq"], obj["idf"], float(obj.get("default_idf", 1.0)), int(obj.get("n_docs", 0))
+    return obj, {}, 1.0, 0
+
+
+class KeywordModel:
+    """常驻内存的关键词模型，文件变化时自动热加载"""
+
+    def __init__(self, model_path: str, reload_interval: float = 10.0):
+        self.model_path = model_path
+        self.reload_interval = reload_interval  # 检查文件修改时间的最小间隔（秒）
+        self.word_freq: Optional[Dict[str, int]] = None
+        self.idf: Dict[str, float] = {}
+        self.default_idf = 1.0
+        self.n_docs = 0
+        self._mtime: Optional[float] = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+        # 统计信息
+        self.load_count = 0
+        self.last_load_ms = 0.0
+        self.loaded_at: Optional[float] = None
+        self.lookup_count = 0
+        self._lookup_total = 0.0
+        self._lookup_max = 0.0
+
+    def load(self) -> bool:
+        """从磁盘加载模型，失败时保留已加载的旧模型"""
+        started = time.perf_counter()
+        try:
+            mtime = os.path.getmtime(self.model_path)
+            with open(self.model_path, "rb") as f:
+                word_freq, idf, default_idf, n_docs = parse_keyword_model(pickle.load(f))
+        except FileNotFoundError:
+            logger.error(f"模型文件 {self.model_path} 不存在")
+            return False
+        except Exception as e:
+            logger.error(f"加载关键词模型失败: {e}")
+            return False
+
+        self.word_freq = word_freq
+        self.idf = idf
+        self.default_idf = default_idf
+        self.n_docs = n_docs
+        self._mtime = mtime
+        self.load_count += 1
+        self.last_load_ms = (time.perf_counter() - started) * 1000
+        self.loaded_at = time.time()
+        logger.info(f"关键词模型已从 {self.model_path} 加载: {len(word_freq)} 个词, {len(idf)} 个IDF项, 耗时 {self.last_load_ms:.1f}ms")
+        if not idf:
+            logger.warning("⚠️ 关键词模型为旧格式（无IDF表），所有词IDF按1计算；用 init/tokenization_alg/train_tf_idf.py 重新训练后生效")
+        return True
+
+    def get(self) -> Optional[Dict[str, int]]:
+        """返回当前模型，按间隔检查文件是否更新"""
+        now = time.monotonic()
+        if self.word_freq is None or now - self._last_check >= self.reload_interval:
+            with self._lock:
+                if self.word_freq is None or now - self._last_check >= self.reload_interval:
+                    self._last_check = now
+                    self._reload_if_changed()
+        return self.word_freq
+
+    def _reload_if_changed(self):
+        try:
+            mtime = os.path.getmtime(self.model_path)
+        except OSError:
+            mtime = None
+        if self.word_freq is None or (mtime is not None and mtime != self._mtime):
+            if self.word_freq is not None:
+                logger.info(f"检测到关键词模型文件更新，重新加载: {self.model_path}")
+            self.load()
+
+    def record_lookup(self, elapsed: float):
+        """记录一次关键词查询的耗时（秒）"""
+        self.lookup_count += 1
+        self._lookup_total += elapsed
+        if elapsed > self._lookup_max:
+            self._lookup_max = elapsed
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "model_path": self.model_path,
+            "loaded": self.word_freq is not None,
+            "vocabulary_size": len(self.word_freq) if self.word_freq else 0,
+            "idf_size": len(self.idf),
+            "n_docs": self.n_docs,
+            "load_count": self.load_count,
+            "last_load_ms": round(self.last_load_ms, 3),
+            "loaded_at": self.loaded_at,
+            "lookup_count": self.lookup_count,
+            "avg_lookup_ms": round(self._lookup_total / self.lookup_count * 1000, 3) if self.lookup_count else 0.0,
+            "max_lookup_ms": round(self._lookup_max * 1000, 3),
+        }
+
+
+_keyword_model: Optional[KeywordModel] = None
+
+
+def get_keyword_model() -> KeywordModel:
+    """获取全局关键词模型，路径由KEYWORD_MODEL_PATH配置"""
+    global _keyword_model
+    if _keyword_model is None:
+        _keyword_model = KeywordModel(
+            get_env_var("KEYWORD_MODEL_PATH", DEFAULT_MODEL_PATH),
+            reload_interval=float(get_env_var("KEYWORD_MODEL_RELOAD_INTERVAL", "10")),
+        )
+        _keyword_model.get()
+    return _keyword_model
@@ -1,12 +1,13 @@
 import asyncio
 import json
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Union
 from datetime import datetime
 import redis.asyncio as redis
 
-from backend.models.token import TokenData, AnalysisResult
+from backend.models.token import TokenData, TokenRecord, AnalysisResult
 from backend.utils.logger import setup_logger
 from backend.utils.env_loader import get_env_var
+from backend.utils.message_codec import encode_analysis_task, encode_envelope
 import uuid
 
 logger = setup_logger(__name__)
@@ -42,44 +43,53 @@ class MessageQueue:
         if self.redis_client:
             await self.redis_client.close()
             
-    async def add_analysis_task(self, token_data: TokenData):
+    async def add_analysis_task(self, token_data: Union[TokenRecord, TokenData]):
         """添加代币分析任务到队列"""
-        # 使用安全的JSON序列化方法
-        task_data = {
-            "token_data": token_data.to_json_dict(),
-            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "task_id": f"{token_data.mint}_{str(uuid.uuid4())}"
-        }
-        logger.info(f"task_data = {task_data}")
-        
-        # 创建初始分析结果
-        analysis_result = AnalysisResult(
-            token_mint=token_data.mint,
-            token_symbol=token_data.symbol,
-            token_name=token_data.name,
-            status="PENDING",
-            progress=0.0
-        )
-        
-        self.pending_analyses[token_data.mint] = analysis_result
-        
+        await self.add_analysis_tasks([token_data])
+
+    async def add_analysis_tasks(self, tokens: List[Union[TokenRecord, TokenData]]):
+        """批量添加代币分析任务，Redis模式下一次LPUSH写入整批"""
+        if not tokens:
+            return
+
+        created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        tasks = []
+        for token_data in tokens:
+            # 直接嵌入代币已缓存的JSON编码，不再重复序列化
+            task_json = encode_analysis_task(
+                token_data.to_json(),
+                created_at,
+                f"{token_data.mint}_{str(uuid.uuid4())}"
+            )
+            logger.debug(f"task_data = {task_json}")
+            tasks.append(task_json)
+
+            # 创建初始分析结果
+            self.pending_analyses[token_data.mint] = AnalysisResult(
+                token_mint=token_data.mint,
+                token_symbol=token_data.symbol,
+                token_name=token_data.name,
+                status="PENDING",
+                progress=0.0
+            )
+
+        symbols = ", ".join(token_data.symbol for token_data in tokens)
         if self.redis_client:
             try:
-                await self.redis_client.lpush(
-                    self.analysis_queue_key, 
-                    json.dumps(task_data)
-                )
-                logger.info(f"任务已添加到Redis队列: {token_data.symbol}")
+                await self.redis_client.lpush(self.analysis_queue_key, *tasks)
+                logger.info(f"任务已添加到Redis队列: {symbols}")
             except Exception as e:
                 logger.error(f"添加任务到Redis失败: {e}")
                 # 回退到内存队列
-                await self._memory_queue.put(task_data)
+                for task_json in tasks:
+                    await self._memory_task_queue.put(task_json)
         else:
-            # 使用内存任务队列
-            await self._memory_task_queue.put(task_data)
-            
-        logger.info(f"代币分析任务已入队: {token_data.symbol} ({token_data.mint})")
-        
+            # 使用内存任务队列，与Redis一样存放JSON字符串
+            for task_json in tasks:
+                await self._memory_task_queue.put(task_json)
+
+        logger.info(f"代币分析任务已入队: {len(tasks)} 个 [{symbols}]")
+
     async def get_analysis_task(self) -> Optional[Dict[str, Any]]:
         """从队列获取分析任务"""
         if self.redis_client:
@@ -94,7 +104,8 @@ class MessageQueue:
         else:
             # 使用内存任务队列
             try:
-                return await asyncio.wait_for(self._memory_task_queue.get(), timeout=1.0)
+                task_json = await asyncio.wait_for(self._memory_task_queue.get(), timeout=1.0)
+                return json.loads(task_json)
             except asyncio.TimeoutError:
                 return None
                 
@@ -134,17 +145,13 @@ class MessageQueue:
             
     async def publish_analysis_update(self, analysis_result: AnalysisResult):
         """发布分析更新"""
-        message = {
-            "type": "analysis_update",
-            "data": analysis_result.to_json_dict(),
-            "timestamp": datetime.now().isoformat()
-        }
+        message = encode_envelope("analysis_update", analysis_result.to_json())
         
         if self.redis_client:
             try:
                 await self.redis_client.publish(
                     self.result_channel, 
-                    json.dumps(message)
+                    message
                 )
             except Exception as e:
                 logger.error(f"发布分析更新失败: {e}")
@@ -154,27 +161,23 @@ class MessageQueue:
     async def publish_analysis_result(self, analysis_result: AnalysisResult,type:str="simple"):
         """发布分析结果"""
         
-        message = {
-            "type": "analysis_complete",
-            "data": analysis_result.to_json_dict(),
-            "timestamp": datetime.now().isoformat()
-        }
-        if type=="full":
-            message["type"] = "analysis_complete_full"
+        msg_type = "analysis_complete_full" if type == "full" else "analysis_complete"
+        # 只编码一次，Redis发布和内存回退共用
+        message = encode_envelope(msg_type, analysis_result.to_json())
         # logger.info(f"分析完成 :{analysis_result.token_mint}")
         if self.redis_client:
             try:
                 await self.redis_client.publish(
                     self.result_channel, 
-                    json.dumps(message)
+                    message
                 )
             except Exception as e:
                 logger.error(f"发布分析结果失败: {e}")
                 # 回退到内存结果队列，存储JSON字符串
-                await self._memory_result_queue.put(json.dumps(message))
+                await self._memory_result_queue.put(message)
         else:
             # 使用内存结果队列，存储JSON字符串
-            await self._memory_result_queue.put(json.dumps(message))
+            await self._memory_result_queue.put(message)
             logger.info(f"current memory_result_queue = {self._memory_result_queue}")
         
         logger.info(f"分析完成: {analysis_result.token_symbol}")
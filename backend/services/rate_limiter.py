@@ -0,0 +1,293 @@
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+from urllib.parse import urlparse
+
+from backend.serp_extractor import RESULT_CLASS
+from backend.utils.logger import setup_logger
+from backend.utils.env_loader import get_env_var
+
+logger = setup_logger(__name__)
+
+# 预约一个令牌：按当前速率补充令牌后扣减1个（可以扣成负数，表示排队），返回需要等待的秒数
+_RESERVE_SCRIPT = """
+local key = KEYS[1]
+local default_rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local data = redis.call('HMGET', key, 'tokens', 'ts', 'rate')
+local rate = tonumber(data[3]) or default_rate
+local tokens = tonumber(data[1]) or burst
+local ts = tonumber(data[2]) or now
+tokens = math.min(burst, tokens + (now - ts) * rate)
+local wait = 0
+if tokens < 1 then
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', key, 'tokens', tokens - 1, 'ts', now, 'rate', rate)
+redis.call('EXPIRE', key, 3600)
+return {tostring(wait), tostring(rate)}
+"""
+
+# 调整速率：throttled=1 时减半（冷却期内只减一次），否则加性恢复，返回新的速率
+_ADJUST_SCRIPT = """
+local key = KEYS[1]
+local throttled = tonumber(ARGV[1])
+local default_rate = tonumber(ARGV[2])
+local min_rate = tonumber(ARGV[3])
+local max_rate = tonumber(ARGV[4])
+local step = tonumber(ARGV[5])
+local cooldown = tonumber(ARGV[6])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local data = redis.call('HMGET', key, 'rate', 'penalized_at')
+local rate = tonumber(data[1]) or default_rate
+local penalized_at = tonumber(data[2]) or 0
+if throttled == 1 then
+    if now - penalized_at >= cooldown then
+        rate = math.max(min_rate, rate / 2)
+        redis.call('HSET', key, 'rate', rate, 'penalized_at', now)
+    end
+else
+    rate = math.min(max_rate, rate + step)
+    redis.call('HSET', key, 'rate', rate)
+end
+redis.call('EXPIRE', key, 3600)
+return tostring(rate)
+"""
+
+
+class AdaptiveRateLimiter:
+    """
+    自适应令牌桶限流器（AIMD），所有分析工作协程和同步调用线程共享。
+
+    - 令牌按 rate 个/秒 补充，桶容量 burst；每个请求消耗一个令牌，不足时等待。
+    - 被限流（429 / 验证码页）时速率减半，cooldown 秒内多次限流只减一次，最低 min_rate；
+      每次正常响应速率加性恢复 recovery_step，最高 max_rate。
+    - 配置 redis_url 时令牌桶和当前速率保存在Redis中（Lua脚本原子更新），多个进程共享同一个额度；
+      Redis出错时 redis_retry_interval 秒内退回本进程内的令牌桶。
+    - 异步代码使用 acquire / report，同步代码（requests）使用 acquire_blocking / report_blocking。
+    - clock / sleep / async_sleep 默认为 time.monotonic / time.sleep / asyncio.sleep，测试时可替换为假时钟。
+    """
+
+    def __init__(self, rate: float = 4.0, burst: float = 2.0, min_rate: float = 0.2,
+                 max_rate: Optional[float] = None, recovery_step: float = 0.05, cooldown: float = 5.0,
+                 redis_url: Optional[str] = None, key: str = "rate_limiter:google_search",
+                 redis_retry_interval: float = 60, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep,
+                 async_sleep: Callable[[float], Awaitable[None]] = asyncio.sleep):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate or rate
+        self.recovery_step = recovery_step
+        self.cooldown = cooldown
+        self.redis_url = redis_url
+        self.key = key
+        self.redis_retry_interval = redis_retry_interval
+        self._clock = clock
+        self._sleep = sleep
+        self._async_sleep = async_sleep
+
+        self._tokens = burst
+        self._last_refill = clock()
+        self._penalized_at = float("-inf")
+        self._lock = threading.Lock()  # 同时保护异步和同步调用方
+        self._redis = None
+        self._redis_sync = None
+        self._redis_disabled_until = 0.0
+
+        # 统计信息
+        self.acquired = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.redis_errors = 0
+
+    # ------------------------------------------------------------------
+    # 本进程内的令牌桶
+    # ------------------------------------------------------------------
+
+    def _reserve_local(self) -> float:
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+            wait = (1 - self._tokens) / self.rate if self._tokens < 1 else 0.0
+            self._tokens -= 1
+            return wait
+
+    def _adjust_local(self, throttled: bool) -> float:
+        with self._lock:
+            if throttled:
+                now = self._clock()
+                if now - self._penalized_at >= self.cooldown:
+                    self._penalized_at = now
+                    self.rate = max(self.min_rate, self.rate / 2)
+            else:
+                self.rate = min(self.max_rate, self.rate + self.recovery_step)
+            return self.rate
+
+    # ------------------------------------------------------------------
+    # Redis共享令牌桶
+    # ------------------------------------------------------------------
+
+    def _redis_available(self) -> bool:
+        return bool(self.redis_url) and self._clock() >= self._redis_disabled_until
+
+    def _redis_failed(self, e: Exception):
+        self.redis_errors += 1
+        self._redis_disabled_until = self._clock() + self.redis_retry_interval
+        logger.warning(f"⚠️ 限流器Redis不可用，{self.redis_retry_interval:.0f}s内使用进程内令牌桶: {e}")
+
+    def _scripts(self):
+        if self._redis is None:
+            import redis.asyncio as redis
+            client = redis.from_url(self.redis_url, decode_responses=True)
+            self._redis = (client, client.register_script(_RESERVE_SCRIPT), client.register_script(_ADJUST_SCRIPT))
+        return self._redis
+
+    def _scripts_sync(self):
+        if self._redis_sync is None:
+            import redis
+            client = redis.Redis.from_url(self.redis_url, decode_responses=True)
+            self._redis_sync = (client, client.register_script(_RESERVE_SCRIPT), client.register_script(_ADJUST_SCRIPT))
+        return self._redis_sync
+
+    def _reserve_args(self):
+        return [self.max_rate, self.burst]
+
+    def _adjust_args(self, throttled: bool):
+        return [1 if throttled else 0, self.max_rate, self.min_rate, self.max_rate, self.recovery_step, self.cooldown]
+
+    # ------------------------------------------------------------------
+    # 对外接口
+    # ------------------------------------------------------------------
+
+    def _record_wait(self, wait: float):
+        self.acquired += 1
+        self.total_wait += wait
+
+    async def acquire(self) -> float:
+        """等待一个令牌（异步），返回等待的秒数"""
+        wait = None
+        if self._redis_available():
+            try:
+                _, reserve, _ = self._scripts()
+                wait, rate = await reserve(keys=[self.key], args=self._reserve_args())
+                wait, self.rate = float(wait), float(rate)
+            except Exception as e:
+                self._redis_failed(e)
+                wait = None
+        if wait is None:
+            wait = self._reserve_local()
+        self._record_wait(wait)
+        if wait > 0:
+            await self._async_sleep(wait)
+        return wait
+
+    def acquire_blocking(self) -> float:
+        """等待一个令牌（同步，阻塞当前线程），返回等待的秒数"""
+        wait = None
+        if self._redis_available():
+            try:
+                _, reserve, _ = self._scripts_sync()
+                wait, rate = reserve(keys=[self.key], args=self._reserve_args())
+                wait, self.rate = float(wait), float(rate)
+            except Exception as e:
+                self._redis_failed(e)
+                wait = None
+        if wait is None:
+            wait = self._reserve_local()
+        self._record_wait(wait)
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+    def _log_throttled(self, throttled: bool, before: float):
+        if throttled:
+            self.throttled += 1
+            if self.rate < before:
+                logger.warning(f"⚠️ Google搜索被限流，请求速率降至 {self.rate:.2f}/s")
+
+    async def report(self, throttled: bool):
+        """报告一次请求的结果（异步）：被限流时降速，否则逐步恢复"""
+        before = self.rate
+        if self._redis_available():
+            try:
+                _, _, adjust = self._scripts()
+                self.rate = float(await adjust(keys=[self.key], args=self._adjust_args(throttled)))
+                self._log_throttled(throttled, before)
+                return
+            except Exception as e:
+                self._redis_failed(e)
+        self._adjust_local(throttled)
+        self._log_throttled(throttled, before)
+
+    def report_blocking(self, throttled: bool):
+        """报告一次请求的结果（同步）"""
+        before = self.rate
+        if self._redis_available():
+            try:
+                _, _, adjust = self._scripts_sync()
+                self.rate = float(adjust(keys=[self.key], args=self._adjust_args(throttled)))
+                self._log_throttled(throttled, before)
+                return
+            except Exception as e:
+                self._redis_failed(e)
+        self._adjust_local(throttled)
+        self._log_throttled(throttled, before)
+
+    async def close(self):
+        if self._redis is not None:
+            try:
+                await self._redis[0].close()
+            except Exception:
+                pass
+            self._redis = None
+        if self._redis_sync is not None:
+            self._redis_sync[0].close()
+            self._redis_sync = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "rate": round(self.rate, 3),
+            "max_rate": self.max_rate,
+            "min_rate": self.min_rate,
+            "burst": self.burst,
+            "redis_enabled": bool(self.redis_url),
+            "acquired": self.acquired,
+            "throttled": self.throttled,
+            "avg_wait_ms": round(self.total_wait / self.acquired * 1000, 3) if self.acquired else 0.0,
+            "redis_errors": self.redis_errors,
+        }
+
+
+def is_throttled_response(status: int, url: str, text: str) -> bool:
+    """
+    Google的限流响应：HTTP 429，或被重定向到 /sorry/ 验证码页；
+    页面提示异常流量（unusual traffic）只在没有任何结果块时才算限流，避免正常结果中恰好含有这段文字时误降速。
+    """
+    if status == 429 or urlparse(url).path.startswith("/sorry/"):
+        return True
+    return RESULT_CLASS not in text and "unusual traffic" in text.lower()
+
+
+_search_rate_limiter: Optional[AdaptiveRateLimiter] = None
+
+
+def get_search_rate_limiter() -> AdaptiveRateLimiter:
+    """
+    获取Google搜索共用的限流器。
+    SEARCH_RATE_LIMIT 为每秒请求数，SEARCH_RATE_REDIS_URL（未设置时使用REDIS_URL）为空时只在本进程内限流。
+    """
+    global _search_rate_limiter
+    if _search_rate_limiter is None:
+        _search_rate_limiter = AdaptiveRateLimiter(
+            rate=float(get_env_var("SEARCH_RATE_LIMIT", "4")),
+            burst=float(get_env_var("SEARCH_RATE_BURST", "2")),
+            min_rate=float(get_env_var("SEARCH_MIN_RATE", "0.2")),
+            redis_url=get_env_var("SEARCH_RATE_REDIS_URL", get_env_var("REDIS_URL")) or None,
+        )
+    return _search_rate_limiter
@@ -0,0 +1,174 @@
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.utils.logger import setup_logger
+from backend.utils.env_loader import get_env_var
+
+logger = setup_logger(__name__)
+
+# (链接, 标题, 描述)
+CachedResult = Tuple[str, str, str]
+
+
+class SearchCache:
+    """
+    搜索结果两级缓存：进程内LRU + 可选的Redis（多个进程/重启之间共享）。
+    以查询词为键；只含代币符号的查询按 ttl 缓存、在同符号的所有代币之间共享，
+    含mint地址的查询按较短的 mint_ttl 单独缓存；
+    空结果按更短的 negative_ttl 缓存，避免对搜不到结果的查询反复请求Google。
+    Redis出错时暂停使用 redis_retry_interval 秒，期间只用进程内缓存。
+    """
+
+    def __init__(self, max_size: int = 2048, ttl: float = 1800, mint_ttl: float = 600, negative_ttl: float = 120,
+                 redis_url: Optional[str] = None, key_prefix: str = "search_cache:",
+                 redis_retry_interval: float = 60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.mint_ttl = mint_ttl
+        self.negative_ttl = negative_ttl
+        self.redis_url = redis_url
+        self.key_prefix = key_prefix
+        self.redis_retry_interval = redis_retry_interval
+        self._memory: "OrderedDict[str, Tuple[List[CachedResult], float]]" = OrderedDict()
+        self._redis = None
+        self._redis_disabled_until = 0.0
+
+        # 统计信息
+        self.memory_hits = 0
+        self.redis_hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.negative_stores = 0
+        self.evictions = 0
+        self.redis_errors = 0
+
+    @staticmethod
+    def _key(query: str) -> str:
+        return " ".join(query.lower().split())
+
+    def _get_redis(self):
+        if not self.redis_url or time.monotonic() < self._redis_disabled_until:
+            return None
+        if self._redis is None:
+            import redis.asyncio as redis
+            self._redis = redis.from_url(self.redis_url, decode_responses=True)
+        return self._redis
+
+    def _redis_failed(self, e: Exception):
+        self.redis_errors += 1
+        self._redis_disabled_until = time.monotonic() + self.redis_retry_interval
+        logger.warning(f"⚠️ 搜索缓存Redis不可用，{self.redis_retry_interval:.0f}s内只使用进程内缓存: {e}")
+
+    async def get(self, query: str) -> Optional[List[CachedResult]]:
+        """查询缓存，命中返回结果列表（可能为空列表，表示缓存的空结果），未命中返回None"""
+        key = self._key(query)
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None:
+            results, expires_at = entry
+            if expires_at > now:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                if not results:
+                    self.negative_hits += 1
+                return results
+            del self._memory[key]
+
+        client = self._get_redis()
+        if client is not None:
+            try:
+                async with client.pipeline(transaction=False) as pipe:
+                    pipe.get(self.key_prefix + key)
+                    pipe.ttl(self.key_prefix + key)
+                    raw, ttl = await pipe.execute()
+            except Exception as e:
+                self._redis_failed(e)
+            else:
+                if raw is not None:
+                    results = [tuple(result) for result in json.loads(raw)]
+                    self._put_memory(key, results, now + (ttl if ttl and ttl > 0 else self.negative_ttl))
+                    self.redis_hits += 1
+                    if not results:
+                        self.negative_hits += 1
+                    return results
+
+        self.misses += 1
+        return None
+
+    async def set(self, query: str, results: List[CachedResult], ttl: Optional[float] = None):
+        """写入缓存；空结果使用negative_ttl，否则使用ttl（默认self.ttl）"""
+        key = self._key(query)
+        results = [tuple(result) for result in results]
+        if results:
+            ttl = ttl or self.ttl
+            self.stores += 1
+        else:
+            ttl = self.negative_ttl
+            self.negative_stores += 1
+        self._put_memory(key, results, time.time() + ttl)
+
+        client = self._get_redis()
+        if client is not None:
+            try:
+                await client.set(self.key_prefix + key, json.dumps(results), ex=max(1, int(ttl)))
+            except Exception as e:
+                self._redis_failed(e)
+
+    def _put_memory(self, key: str, results: List[CachedResult], expires_at: float):
+        self._memory[key] = (results, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    async def close(self):
+        if self._redis is not None:
+            try:
+                await self._redis.close()
+            except Exception:
+                pass
+            self._redis = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        hits = self.memory_hits + self.redis_hits
+        lookups = hits + self.misses
+        return {
+            "memory_size": len(self._memory),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "mint_ttl_seconds": self.mint_ttl,
+            "negative_ttl_seconds": self.negative_ttl,
+            "redis_enabled": bool(self.redis_url),
+            "memory_hits": self.memory_hits,
+            "redis_hits": self.redis_hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "negative_stores": self.negative_stores,
+            "evictions": self.evictions,
+            "redis_errors": self.redis_errors,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+_search_cache: Optional[SearchCache] = None
+
+
+def get_search_cache() -> SearchCache:
+    """
+    获取全局搜索缓存。
+    SEARCH_CACHE_REDIS_URL（未设置时使用REDIS_URL）为空时只使用进程内缓存。
+    """
+    global _search_cache
+    if _search_cache is None:
+        _search_cache = SearchCache(
+            max_size=int(get_env_var("SEARCH_CACHE_SIZE", "2048")),
+            ttl=float(get_env_var("SEARCH_CACHE_TTL", "1800")),
+            mint_ttl=float(get_env_var("SEARCH_CACHE_MINT_TTL", "600")),
+            negative_ttl=float(get_env_var("SEARCH_CACHE_NEGATIVE_TTL", "120")),
+            redis_url=get_env_var("SEARCH_CACHE_REDIS_URL", get_env_var("REDIS_URL")) or None,
+        )
+    return _search_cache
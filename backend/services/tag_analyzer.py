@@ -2,28 +2,66 @@
 import nltk
 import jieba
 from nltk.corpus import stopwords
-from sklearn.feature_extraction.text import TfidfVectorizer
 import pickle
 import string
 import re
+import math
 import asyncio
+import time
+from collections import Counter
+from typing import Dict, Optional
 
-from backend.services.translate import translate_english
+from backend.services.keyword_model import KeywordModel, get_keyword_model, parse_keyword_model
+from backend.services.translate import translate_english_many
+from backend.utils.logger import setup_logger
 
 # 下载必要的 NLTK 数据（首次运行）
 # nltk.download('punkt')
 # nltk.download('stopwords')
 
+logger = setup_logger(__name__)
+
+# 预编译的正则：保留中文、英文、数字、标点和空格 / 中文片段 / 英文片段
+_CLEAN_PATTERN = re.compile(r'[^\u4e00-\u9fff a-zA-Z0-9\s,.!?]')
+_CHINESE_PATTERN = re.compile(r'[\u4e00-\u9fff]+')
+_ENGLISH_PATTERN = re.compile(r'[a-zA-Z]+')
+# 与 sklearn TfidfVectorizer 默认的 token_pattern 一致，保证评分结果与旧实现相同
+_TOKEN_PATTERN = re.compile(r'(?u)\b\w\w+\b')
+
+_stop_words: Optional[frozenset] = None
+
+
+def get_stop_words() -> frozenset:
+    """中英文停用词集合，只构建一次"""
+    global _stop_words
+    if _stop_words is None:
+        _stop_words = frozenset(stopwords.words('chinese') + stopwords.words('english'))
+    return _stop_words
+
+
+def warmup():
+    """
+    预热分词依赖：构建停用词集合、加载jieba词典和NLTK分词器、加载关键词模型。
+    应在应用启动时调用，避免第一个分析请求承担这些开销。
+    """
+    started = time.perf_counter()
+    get_stop_words()
+    jieba.initialize()
+    nltk.word_tokenize("warm up")
+    get_keyword_model()
+    logger.info(f"标签分析器预热完成，耗时 {(time.perf_counter() - started) * 1000:.0f}ms")
+
+
 def preprocess_text(text, language='chinese'):
     """
     预处理文本：保留中英文、数字、标点和空格，分词并移除停用词。
     """
     # 保留中文、英文、数字、标点和空格
-    text = re.sub(r'[^\u4e00-\u9fff a-zA-Z0-9\s,.!?]', '', text)
+    text = _CLEAN_PATTERN.sub('', text)
 
     # 分离中文和英文部分
-    chinese_parts = re.findall(r'[\u4e00-\u9fff]+', text)
-    english_parts = re.findall(r'[a-zA-Z]+', text)
+    chinese_parts = _CHINESE_PATTERN.findall(text)
+    english_parts = _ENGLISH_PATTERN.findall(text)
 
     # 中文分词
     chinese_words = []
@@ -39,7 +77,7 @@ def preprocess_text(text, language='chinese'):
     words = chinese_words + english_words
     
     # 移除停用词（中文和英文）
-    stop_words = set(stopwords.words('chinese') + stopwords.words('english'))
+    stop_words = get_stop_words()
     words = [word for word in words if word not in stop_words and word.strip()]
 
 
@@ -50,25 +88,48 @@ def load_keyword_model(model_path='keyword_model.pkl'):
     """
     try:
         with open(model_path, 'rb') as f:
-            word_freq = pickle.load(f)
+            word_freq = parse_keyword_model(pickle.load(f))[0]
         print(f"模型已从 {model_path} 加载")
         return word_freq
     except FileNotFoundError:
         print(f"模型文件 {model_path} 不存在")
         return None
 
-def extract_keywords(text, model_path='keyword_model.pkl', n=5, priority_keywords=None)->list[str]:
+def tfidf_scores(text_cleaned: str, idf: Dict[str, float], default_idf: float = 1.0) -> Dict[str, float]:
+    """
+    用预训练的IDF表计算单段文本的TF-IDF分数（L2归一化），只做字典查询。
+    词按字典序遍历，排序时同分词的先后顺序与 TfidfVectorizer 一致。
+    """
+    counts = Counter(_TOKEN_PATTERN.findall(text_cleaned.lower()))
+    weights = {word: counts[word] * idf.get(word, default_idf) for word in sorted(counts)}
+    norm = math.sqrt(sum(w * w for w in weights.values()))
+    if norm == 0:
+        return weights
+    return {word: w / norm for word, w in weights.items()}
+
+
+def extract_keywords(text, model_path=None, n=5, priority_keywords=None, corpus_keywords=None, idf=None, default_idf=1.0)->list[str]:
     """
     从文本中提取前 n 个关键词，使用预训练模型，优先考虑语料库中的关键词。
     
     参数：
     - text: 输入文本
-    - model_path: 预训练模型路径
+    - model_path: 预训练模型路径（可选），不传时使用常驻内存的全局模型
     - n: 返回的关键词数量
     - priority_keywords: 优先级关键词列表（可选）
+    - corpus_keywords: 已加载的模型（可选），传入时不再加载
+    - idf: 与corpus_keywords配套的IDF表（可选），不传时所有词IDF为default_idf
+    - default_idf: IDF表中不存在的词使用的IDF
     """
     # 加载模型
-    corpus_keywords = load_keyword_model(model_path)
+    if corpus_keywords is None:
+        if model_path:
+            model = KeywordModel(model_path)
+            model.load()
+        else:
+            model = get_keyword_model()
+        corpus_keywords = model.get()
+        idf, default_idf = model.idf, model.default_idf
     if not corpus_keywords:
         return []
     
@@ -77,13 +138,7 @@ def extract_keywords(text, model_path='keyword_model.pkl', n=5, priority_keyword
     text_cleaned = ' '.join(words)
     
     # 计算 TF-IDF 分数
-    vectorizer = TfidfVectorizer()
-    tfidf_matrix = vectorizer.fit_transform([text_cleaned])
-    feature_names = vectorizer.get_feature_names_out()
-    tfidf_scores = tfidf_matrix.toarray()[0]
-    
-    # 创建关键词及其 TF-IDF 分数的字典
-    keyword_tfidf = {feature_names[i]: tfidf_scores[i] for i in range(len(feature_names))}
+    keyword_tfidf = tfidf_scores(text_cleaned, idf or {}, default_idf)
     
     # 综合评分：结合 TF-IDF 和语料库频率，并为优先级关键词加权
     combined_scores = {}
@@ -107,10 +162,114 @@ def extract_keywords(text, model_path='keyword_model.pkl', n=5, priority_keyword
     return sorted_keywords[:n]
 
 
+def extract_keywords_batch(texts, n=5, priority_keywords=None, model_path=None) -> list[list[tuple[str, float]]]:
+    """
+    批量提取关键词，用于离线重新打标签等大批量场景，结果与逐条调用 extract_keywords 一致。
+
+    所有文本构建一个稀疏词项矩阵（CSR），IDF、语料库频率和优先级权重按列向量一次性施加，
+    再对整个矩阵排序取每行前 n 个。依赖 numpy / scipy，仅在调用时导入。
+
+    参数：
+    - texts: 输入文本列表
+    - n: 每段文本返回的关键词数量
+    - priority_keywords: 优先级关键词列表（可选）
+    - model_path: 预训练模型路径（可选），不传时使用常驻内存的全局模型
+
+    返回与texts一一对应的 [(关键词, 分数), ...] 列表
+    """
+    import numpy as np
+    from scipy.sparse import csr_matrix
+
+    if model_path:
+        model = KeywordModel(model_path)
+        model.load()
+    else:
+        model = get_keyword_model()
+    corpus_keywords = model.get()
+    if not corpus_keywords or not texts:
+        return [[] for _ in texts]
+
+    # 分词并构建词表，每行一个Counter
+    vocabulary: Dict[str, int] = {}
+    indptr = [0]
+    indices = []
+    counts = []
+    for text in texts:
+        row = Counter(_TOKEN_PATTERN.findall(' '.join(preprocess_text(text)).lower()))
+        for word, count in row.items():
+            indices.append(vocabulary.setdefault(word, len(vocabulary)))
+            counts.append(count)
+        indptr.append(len(indices))
+
+    # 列按词的字典序重新编号，保证同分时的先后顺序与 extract_keywords 一致
+    terms = np.array(list(vocabulary), dtype=object)
+    alphabetical = np.argsort(terms)
+    terms = terms[alphabetical]
+    rank = np.empty(len(alphabetical), dtype=np.int64)
+    rank[alphabetical] = np.arange(len(alphabetical))
+    matrix = csr_matrix(
+        (np.asarray(counts, dtype=np.float64), rank[np.asarray(indices, dtype=np.int64)], np.asarray(indptr, dtype=np.int64)),
+        shape=(len(texts), len(terms)),
+    )
+
+    # 按列的权重向量：IDF / 语料库频率 / 优先级
+    priority = set(priority_keywords or [])
+    idf, default_idf = model.idf, model.default_idf
+    idf_weights = np.fromiter((idf.get(t, default_idf) for t in terms), dtype=np.float64, count=len(terms))
+    corpus_weights = np.fromiter(
+        (1 + corpus_keywords[t] if t in corpus_keywords else 1.0 for t in terms),
+        dtype=np.float64, count=len(terms),
+    )
+    priority_weights = np.fromiter(
+        (3.0 if t in priority and t in corpus_keywords else 1.0 for t in terms),
+        dtype=np.float64, count=len(terms),
+    )
+
+    # TF-IDF 并按行L2归一化，再依次乘语料库权重和优先级权重
+    # （乘法顺序与 extract_keywords 相同，两条路径中同分的词一致，排序也一致）
+    matrix.data *= idf_weights[matrix.indices]
+    row_lengths = np.diff(matrix.indptr)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    matrix.data /= np.repeat(norms, row_lengths)
+    matrix.data *= corpus_weights[matrix.indices]
+    matrix.data *= priority_weights[matrix.indices]
+
+    # 整体排序：行号升序、分数降序、列号（字典序）升序，然后取每行前 n 个
+    rows = np.repeat(np.arange(len(texts)), row_lengths)
+    order = np.lexsort((matrix.indices, -matrix.data, rows))
+    position = np.arange(len(order)) - matrix.indptr[rows[order]]
+    keep = order[position < n]
+    kept_rows = rows[keep]
+    kept_terms = terms[matrix.indices[keep]].tolist()
+    kept_scores = matrix.data[keep].tolist()
+    bounds = np.searchsorted(kept_rows, np.arange(len(texts) + 1)).tolist()
+    return [
+        list(zip(kept_terms[bounds[i]:bounds[i + 1]], kept_scores[bounds[i]:bounds[i + 1]]))
+        for i in range(len(texts))
+    ]
+
+
 async def extract_crypto_tag(text)->list[str]:
-    tasks = [translate_english(kv[0]) for kv in extract_keywords(text, model_path='D:/ai_crypto/init/tokenization_alg/keyword_model.pkl', n=3, priority_keywords=[]) ]
-    return await asyncio.gather(*tasks)
+    return (await extract_crypto_tags([text]))[0]
+
 
-res = extract_crypto_tag("由于缺乏明确的用例、合作伙伴关系或社区支持，PROTEST 代币的市场分析非常困难。 空投抗议的概念可能吸引那些对特定事业充满热情的人，但也可能面临来自监管机构的审查，以及因与政治运动挂钩而导致的价格波动。 网络搜索结果显示，加密货币已被用于抗议活动，但同时也显示了公众对某些加密货币（如比特币在萨尔瓦多的使用）的抗议。 此外，代币供应量的差异表明存在潜在风险，用户应审慎判断。 总的来说，该代币的市场需求和长期可持续性高度不确定。 由于该项目还处于早期阶段，流动性可能较低，并且价格容易受到操纵。")
+async def extract_crypto_tags(texts: list[str]) -> list[list[str]]:
+    """
+    批量提取多段文本的标签：使用常驻内存的关键词模型，所有文本中重复的关键词只翻译一次
+    （优先查离线词典，未命中的词批量走网络翻译），
+    返回与texts一一对应的标签列表。
+    """
+    model = get_keyword_model()
+    corpus_keywords = model.get()
+    keyword_lists = []
+    for text in texts:
+        started = time.perf_counter()
+        keyword_lists.append([kv[0] for kv in extract_keywords(
+            text, n=3, priority_keywords=[], corpus_keywords=corpus_keywords,
+            idf=model.idf, default_idf=model.default_idf,
+        )])
+        model.record_lookup(time.perf_counter() - started)
 
-print(res)
\ No newline at end of file
+    unique_keywords = list(dict.fromkeys(word for words in keyword_lists for word in words))
+    translations = await translate_english_many(unique_keywords)
+    return [[translations[word] for word in words] for words in keyword_lists]
@@ -1,13 +1,155 @@
-from googletrans import Translator
 import asyncio
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional
+
+from backend.services.translation_cache import get_translation_cache
+from backend.utils.logger import setup_logger
+from backend.utils.env_loader import get_env_var
+
+logger = setup_logger(__name__)
+
+DEFAULT_DICT_PATH = os.path.join(os.path.dirname(__file__), "translation_dict.json")
+
+
+class TranslationBackend(ABC):
+    """
+    翻译后端接口。translate_many 只返回翻译成功的词，未返回的词交给下一个后端。
+    cacheable 为 True 的后端（网络翻译）结果写入翻译缓存，离线后端本身就在内存中，不需要缓存。
+    """
+
+    name = "base"
+    cacheable = False
+
+    @abstractmethod
+    async def translate_many(self, words: List[str], src: str, dest: str) -> Dict[str, str]:
+        """翻译一批词，返回 {原词: 译文}，只包含翻译成功的词"""
+
+
+class DictionaryBackend(TranslationBackend):
+    """离线词典后端：根据训练语料高频中文词人工整理的中英词典（translation_dict.json），只支持中译英"""
+
+    name = "dictionary"
+
+    def __init__(self, path: Optional[str] = DEFAULT_DICT_PATH, entries: Optional[Dict[str, str]] = None):
+        self.path = path
+        self.entries: Dict[str, str] = dict(entries or {})
+        if path and entries is None:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.error(f"❌ 加载翻译词典失败 {path}: {e}")
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.entries
+
+    async def translate_many(self, words: List[str], src: str, dest: str) -> Dict[str, str]:
+        if not src.startswith("zh") or dest != "en":
+            return {}
+        return {word: self.entries[word] for word in words if word in self.entries}
+
+
+class GoogleTranslateBackend(TranslationBackend):
+    """
+    googletrans 网络后端：复用同一个Translator，每个词单独请求，最多 concurrency 个请求同时进行。
+    （googletrans 4.x 传入列表时也是逐词请求，且任意一个词失败会让整批结果丢失，因此在这里逐词处理）
+    失败的词不返回结果，交给下一个后端或原样返回。
+    """
+
+    name = "google"
+    cacheable = True
+
+    def __init__(self, concurrency: int = 5):
+        self.concurrency = concurrency
+        self._translator = None
+
+    def _get_translator(self):
+        if self._translator is None:
+            from googletrans import Translator
+            self._translator = Translator()
+        return self._translator
+
+    async def translate_many(self, words: List[str], src: str, dest: str) -> Dict[str, str]:
+        translator = self._get_translator()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def translate_one(word: str):
+            async with semaphore:
+                return await translator.translate(word, src=src, dest=dest)
+
+        translated = await asyncio.gather(*[translate_one(word) for word in words], return_exceptions=True)
+        results = {}
+        failures = []
+        for word, item in zip(words, translated):
+            if isinstance(item, BaseException):
+                failures.append(item)
+            elif item is not None and item.text:
+                results[word] = item.text
+        if failures:
+            logger.warning(f"⚠️ 网络翻译失败 {len(failures)}/{len(words)} 个词: {failures[0]}")
+        return results
+
+
+_backends: Optional[List[TranslationBackend]] = None
+
+
+def _create_backend(name: str) -> TranslationBackend:
+    if name == "dictionary":
+        return DictionaryBackend(get_env_var("TRANSLATION_DICT_PATH", DEFAULT_DICT_PATH))
+    if name == "google":
+        return GoogleTranslateBackend(int(get_env_var("TRANSLATION_CONCURRENCY", "5")))
+    raise ValueError(f"未知的翻译后端: {name}")
+
+
+def get_translation_backends() -> List[TranslationBackend]:
+    """按TRANSLATION_BACKENDS配置（逗号分隔，默认 dictionary,google）依次尝试的翻译后端"""
+    global _backends
+    if _backends is None:
+        names = get_env_var("TRANSLATION_BACKENDS", "dictionary,google")
+        _backends = [_create_backend(name.strip()) for name in names.split(",") if name.strip()]
+    return _backends
+
+
+def set_translation_backends(backends: Iterable[TranslationBackend]):
+    """替换翻译后端（测试或离线运行时使用）"""
+    global _backends
+    _backends = list(backends)
+
+
+async def _resolve(words: List[str], src: str, dest: str) -> Dict[str, str]:
+    """依次经过各后端翻译，只返回翻译成功的词；网络后端之前先查翻译缓存"""
+    pending = list(dict.fromkeys(words))
+    resolved: Dict[str, str] = {}
+    cache = get_translation_cache()
+    cache_checked = False
+    for backend in get_translation_backends():
+        if not pending:
+            break
+        if backend.cacheable and not cache_checked:
+            cache_checked = True
+            resolved.update(await cache.get_many(pending, src, dest))
+            pending = [word for word in pending if word not in resolved]
+            if not pending:
+                break
+        results = await backend.translate_many(pending, src, dest)
+        if backend.cacheable:
+            await cache.set_many(results, src, dest)
+        resolved.update(results)
+        pending = [word for word in pending if word not in resolved]
+    return resolved
+
+
+async def translate_many(words: List[str], src='zh-cn', dest='en') -> Dict[str, str]:
+    """批量翻译，返回 {原词: 译文}；所有后端都翻译失败的词原样返回"""
+    resolved = await _resolve(words, src, dest)
+    return {word: resolved.get(word, word) for word in words}
+
 
 async def translate_text(text, src='zh-cn', dest='en'):
-    translator = Translator()
-    try:
-        translated = await translator.translate(text, src=src, dest=dest)
-        return translated.text
-    except Exception as e:
-        return f"翻译失败: {str(e)}"
+    return (await translate_many([text], src=src, dest=dest))[text]
 
 def is_chinese_or_english(keyword):
     """
@@ -45,6 +187,40 @@ async def translate_english(word:str)->str:
         return word
     return await translate_text(word)
 
+
+async def translate_english_many(words: List[str]) -> Dict[str, str]:
+    """批量把中文关键词翻译为英文，非纯中文的词原样返回"""
+    chinese = [word for word in words if is_chinese_or_english(word) == "chinese"]
+    translations = await translate_many(chinese) if chinese else {}
+    return {word: translations.get(word, word) for word in words}
+
+
+async def preseed_translation_cache(limit: int = 500):
+    """
+    用关键词模型中出现频率最高的中文词预热翻译缓存，使运行时的大部分标签翻译不需要请求外部服务。
+    离线词典已覆盖或已缓存（包括SQLite中未过期）的词跳过，应在启动后作为后台任务运行。
+    """
+    from backend.services.keyword_model import get_keyword_model
+
+    word_freq = get_keyword_model().get()
+    if not word_freq:
+        return
+    cache = get_translation_cache()
+    dictionaries = [b for b in get_translation_backends() if isinstance(b, DictionaryBackend)]
+    started = time.perf_counter()
+    candidates = [word for word, _ in word_freq.most_common() if is_chinese_or_english(word) == "chinese"][:limit]
+    offline = {word for word in candidates if any(word in d for d in dictionaries)}
+    cached = await cache.contains_many([word for word in candidates if word not in offline], 'zh-cn', 'en')
+    missing = [word for word in candidates if word not in offline and word not in cached]
+
+    translated = len(await _resolve(missing, 'zh-cn', 'en')) if missing else 0
+    logger.info(
+        f"🔤 翻译缓存预热完成: {len(candidates)} 个高频中文词, 离线词典 {len(offline)}, "
+        f"已缓存 {len(candidates) - len(offline) - len(missing)}, 新翻译 {translated}, "
+        f"失败 {len(missing) - translated}, 耗时 {time.perf_counter() - started:.1f}s"
+    )
+
+
 async def main():
 
     # 测试
@@ -0,0 +1,244 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from backend.utils.logger import setup_logger
+from backend.utils.env_loader import get_env_var
+
+logger = setup_logger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(__file__), "translation_cache.sqlite3")
+
+
+class TranslationCache:
+    """
+    翻译缓存：内存LRU + SQLite持久化，按TTL过期。
+    内存中最多保留max_size条，超出时淘汰最久未使用的；SQLite中保留全部未过期记录，重启后按需读回内存。
+
+    异步代码使用 get_many / set_many / contains_many：内存部分在事件循环中完成，
+    SQLite读写通过 asyncio.to_thread 放到线程中执行，一批词只查询一次、写入只提交一次事务。
+    get / set / contains 为同步接口，会直接访问磁盘，只在同步代码中使用。
+    """
+
+    # 每条 IN 查询最多带的参数个数（SQLite默认上限为999）
+    _QUERY_CHUNK = 500
+
+    def __init__(self, db_path: Optional[str], max_size: int = 10000, ttl: float = 30 * 24 * 3600):
+        self.db_path = db_path
+        self.max_size = max_size
+        self.ttl = ttl
+        self._memory: "OrderedDict[Tuple[str, str, str], Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()  # 保护内存LRU，只短暂持有
+        self._db_lock = threading.Lock()  # 保护SQLite连接，磁盘操作期间持有
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_failed = not db_path
+
+        # 统计信息
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_writes = 0
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """首次访问时打开数据库（在调用线程中，持有 _db_lock），失败后只使用内存缓存"""
+        if self._db is None and not self._db_failed:
+            try:
+                self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS translations ("
+                    "src TEXT NOT NULL, dest TEXT NOT NULL, text TEXT NOT NULL, "
+                    "translated TEXT NOT NULL, expires_at REAL NOT NULL, "
+                    "PRIMARY KEY (src, dest, text))"
+                )
+                self._db.execute("DELETE FROM translations WHERE expires_at < ?", (time.time(),))
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.error(f"❌ 打开翻译缓存数据库失败，仅使用内存缓存: {e}")
+                self._db = None
+                self._db_failed = True
+        return self._db
+
+    # ------------------------------------------------------------------
+    # 异步接口
+    # ------------------------------------------------------------------
+
+    async def get_many(self, texts: Iterable[str], src: str, dest: str) -> Dict[str, str]:
+        """批量查询缓存，返回命中的 {原词: 译文}；内存未命中的词一次性到SQLite中查询"""
+        results, missing = self._get_memory_many(texts, src, dest)
+        if missing and not self._db_failed:
+            rows = await asyncio.to_thread(self._read_db_many, src, dest, missing, time.time())
+            with self._lock:
+                for text, entry in rows.items():
+                    self._put_memory((src, dest, text), entry)
+                    results[text] = entry[0]
+                self.disk_hits += len(rows)
+                missing = [text for text in missing if text not in rows]
+        self.misses += len(missing)
+        return results
+
+    async def set_many(self, translations: Dict[str, str], src: str, dest: str):
+        """批量写入缓存，SQLite中一个事务提交"""
+        if not translations:
+            return
+        expires_at = time.time() + self.ttl
+        rows = [(src, dest, text, translated, expires_at) for text, translated in translations.items()]
+        with self._lock:
+            for src_, dest_, text, translated, expires in rows:
+                self._put_memory((src_, dest_, text), (translated, expires))
+        if not self._db_failed:
+            await asyncio.to_thread(self._write_db_many, rows)
+
+    async def contains_many(self, texts: Iterable[str], src: str, dest: str) -> Set[str]:
+        """返回已缓存的词（不计入命中统计，也不改变LRU顺序）"""
+        now = time.time()
+        texts = list(dict.fromkeys(texts))
+        with self._lock:
+            cached = {text for text in texts if self._memory_entry((src, dest, text), now) is not None}
+        missing = [text for text in texts if text not in cached]
+        if missing and not self._db_failed:
+            cached.update(await asyncio.to_thread(self._read_db_many, src, dest, missing, now))
+        return cached
+
+    # ------------------------------------------------------------------
+    # 同步接口
+    # ------------------------------------------------------------------
+
+    def get(self, text: str, src: str, dest: str) -> Optional[str]:
+        """查询缓存，未命中或已过期返回None"""
+        results, missing = self._get_memory_many([text], src, dest)
+        if missing:
+            rows = self._read_db_many(src, dest, missing, time.time())
+            if rows:
+                with self._lock:
+                    self._put_memory((src, dest, text), rows[text])
+                    self.disk_hits += 1
+                return rows[text][0]
+            self.misses += 1
+            return None
+        return results[text]
+
+    def set(self, text: str, src: str, dest: str, translated: str):
+        """写入缓存（内存和SQLite）"""
+        entry = (translated, time.time() + self.ttl)
+        with self._lock:
+            self._put_memory((src, dest, text), entry)
+        self._write_db_many([(src, dest, text, *entry)])
+
+    def contains(self, text: str, src: str, dest: str) -> bool:
+        """是否已缓存（不计入命中统计，也不改变LRU顺序）"""
+        now = time.time()
+        with self._lock:
+            if self._memory_entry((src, dest, text), now) is not None:
+                return True
+        return bool(self._read_db_many(src, dest, [text], now))
+
+    # ------------------------------------------------------------------
+    # 内存LRU和SQLite读写
+    # ------------------------------------------------------------------
+
+    def _memory_entry(self, key, now: float) -> Optional[Tuple[str, float]]:
+        entry = self._memory.get(key)
+        if entry is not None and entry[1] > now:
+            return entry
+        return None
+
+    def _get_memory_many(self, texts: Iterable[str], src: str, dest: str) -> Tuple[Dict[str, str], List[str]]:
+        """查询内存，返回 (命中结果, 未命中的词)"""
+        now = time.time()
+        results: Dict[str, str] = {}
+        missing: List[str] = []
+        with self._lock:
+            for text in dict.fromkeys(texts):
+                key = (src, dest, text)
+                entry = self._memory_entry(key, now)
+                if entry is not None:
+                    self._memory.move_to_end(key)
+                    results[text] = entry[0]
+                else:
+                    self._memory.pop(key, None)
+                    missing.append(text)
+            self.hits += len(results)
+        return results, missing
+
+    def _put_memory(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _read_db_many(self, src: str, dest: str, texts: List[str], now: float) -> Dict[str, Tuple[str, float]]:
+        rows: Dict[str, Tuple[str, float]] = {}
+        with self._db_lock:
+            db = self._connection()
+            if db is None:
+                return rows
+            try:
+                for start in range(0, len(texts), self._QUERY_CHUNK):
+                    chunk = texts[start:start + self._QUERY_CHUNK]
+                    placeholders = ",".join("?" * len(chunk))
+                    for text, translated, expires_at in db.execute(
+                        "SELECT text, translated, expires_at FROM translations "
+                        f"WHERE src = ? AND dest = ? AND text IN ({placeholders}) AND expires_at > ?",
+                        (src, dest, *chunk, now),
+                    ):
+                        rows[text] = (translated, expires_at)
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ 读取翻译缓存失败: {e}")
+        return rows
+
+    def _write_db_many(self, rows: List[Tuple[str, str, str, str, float]]):
+        with self._db_lock:
+            db = self._connection()
+            if db is None:
+                return
+            try:
+                with db:  # 一个事务，整批只提交一次
+                    db.executemany(
+                        "INSERT OR REPLACE INTO translations (src, dest, text, translated, expires_at) VALUES (?, ?, ?, ?, ?)",
+                        rows,
+                    )
+                self.disk_writes += 1
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ 写入翻译缓存失败: {e}")
+
+    def close(self):
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "db_path": None if self._db_failed else self.db_path,
+            "memory_size": len(self._memory),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "disk_writes": self.disk_writes,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+_translation_cache: Optional[TranslationCache] = None
+
+
+def get_translation_cache() -> TranslationCache:
+    """获取全局翻译缓存，TRANSLATION_CACHE_PATH设为空字符串时只使用内存缓存"""
+    global _translation_cache
+    if _translation_cache is None:
+        _translation_cache = TranslationCache(
+            get_env_var("TRANSLATION_CACHE_PATH", DEFAULT_CACHE_PATH) or None,
+            max_size=int(get_env_var("TRANSLATION_CACHE_SIZE", "10000")),
+            ttl=float(get_env_var("TRANSLATION_CACHE_TTL", str(30 * 24 * 3600))),
+        )
+    return _translation_cache
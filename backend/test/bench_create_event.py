@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+CreateEvent解码微基准
+对比旧版 hex往返+闭包 解析器与 memoryview+预编译struct 解码器
+"""
+
+import base64
+import os
+import struct
+import sys
+import timeit
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(project_root)
+
+from backend.models.token import CreateEvent
+from backend.services.event_decoder import decode_create_event
+from backend.test.test_event_decoder import build_create_event_payload
+
+
+def legacy_parse_create_event(data_hex: str) -> CreateEvent:
+    """旧版TokenMonitor._parse_create_event的实现，仅用于对比"""
+    data = bytes.fromhex(data_hex)
+    offset = 8
+
+    def read_length_prefixed_string() -> str:
+        nonlocal offset
+        if offset + 4 > len(data):
+            raise ValueError("字符串长度数据不足")
+        (length,) = struct.unpack_from("<I", data, offset)
+        offset += 4
+        if length < 0 or offset + length > len(data):
+            raise ValueError(f"无效的字符串长度 {length}")
+        raw = data[offset : offset + length]
+        offset += length
+        return raw.decode("utf-8", errors="replace").rstrip("\x00")
+
+    def read_pubkey_str() -> str:
+        nonlocal offset
+        if offset + 32 > len(data):
+            raise ValueError("公钥数据不足")
+        pk_bytes = data[offset : offset + 32]
+        offset += 32
+        from solders.pubkey import Pubkey
+        return str(Pubkey.from_bytes(pk_bytes))
+
+    name = read_length_prefixed_string()
+    symbol = read_length_prefixed_string()
+    uri = read_length_prefixed_string()
+    mint = read_pubkey_str()
+    bonding_curve = read_pubkey_str()
+    user = read_pubkey_str()
+    creator = read_pubkey_str()
+
+    if offset + 8 > len(data):
+        raise ValueError("时间戳数据不足")
+    (timestamp,) = struct.unpack_from("<q", data, offset)
+    offset += 8
+
+    def read_u64() -> int:
+        nonlocal offset
+        if offset + 8 > len(data):
+            raise ValueError("u64数据不足")
+        (val,) = struct.unpack_from("<Q", data, offset)
+        offset += 8
+        return val
+
+    return CreateEvent(
+        name=name,
+        symbol=symbol,
+        uri=uri,
+        mint=mint,
+        bonding_curve=bonding_curve,
+        user=user,
+        creator=creator,
+        timestamp=timestamp,
+        virtual_token_reserves=read_u64(),
+        virtual_sol_reserves=read_u64(),
+        real_token_reserves=read_u64(),
+        token_total_supply=read_u64(),
+    )
+
+
+def run(number: int = 50000):
+    b64 = base64.b64encode(build_create_event_payload(
+        name="Pepe On Solana", symbol="PEPE", uri="https://ipfs.io/ipfs/QmYwAPJzv5CZsnAzt8auVTLpG1bG6dkprdFM5ocTyBCQb"
+    )).decode()
+
+    assert legacy_parse_create_event(base64.b64decode(b64).hex()) == decode_create_event(base64.b64decode(b64))
+
+    legacy = timeit.timeit(lambda: legacy_parse_create_event(base64.b64decode(b64).hex()), number=number)
+    current = timeit.timeit(lambda: decode_create_event(base64.b64decode(b64)), number=number)
+
+    print(f"📊 CreateEvent解码 ({number} 次, 含base64解码)")
+    print(f"   旧版解析器: {legacy / number * 1e6:.2f} µs/事件")
+    print(f"   新版解码器: {current / number * 1e6:.2f} µs/事件")
+    print(f"   加速比: {legacy / current:.2f}x")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+批量关键词评分基准
+对比逐条调用 extract_keywords 与 extract_keywords_batch（稀疏矩阵向量化）在大批量文本上的吞吐量，
+并单独统计分词（preprocess_text）的耗时，便于区分瓶颈在分词还是评分。
+
+用法:
+    python backend/test/bench_keyword_batch.py [文本数量，默认100000]
+
+文本由关键词模型中的高频词和少量未登录词随机拼接而成，长度与代币描述/分析文本相当。
+逐条调用较慢，只在前 min(文本数, 5000) 条上测量后折算吞吐量。
+"""
+
+import os
+import random
+import sys
+import time
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(project_root)
+
+from backend.services.keyword_model import get_keyword_model
+from backend.services.tag_analyzer import extract_keywords, extract_keywords_batch, preprocess_text
+
+EXTRA_WORDS = ["pepe", "moon", "wif", "bonk", "solana", "pump", "meme", "dog", "cat", "ai"]
+
+
+def build_corpus(count: int, seed: int = 42) -> list:
+    vocabulary = [word for word, _ in get_keyword_model().get().most_common(3000)] + EXTRA_WORDS
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(vocabulary, k=rng.randint(5, 40))) for _ in range(count)]
+
+
+def run(count: int = 100000):
+    texts = build_corpus(count)
+    priority_keywords = EXTRA_WORDS[:3]
+    sample = texts[:min(count, 5000)]
+    for text in sample:  # 预先加载jieba词典并预热分词，不计入耗时
+        preprocess_text(text)
+
+    started = time.perf_counter()
+    for text in sample:
+        preprocess_text(text)
+    tokenize_rate = len(sample) / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    single = [extract_keywords(text, n=3, priority_keywords=priority_keywords) for text in sample]
+    single_rate = len(sample) / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    batch = extract_keywords_batch(texts, n=3, priority_keywords=priority_keywords)
+    batch_elapsed = time.perf_counter() - started
+
+    mismatched = sum(
+        [word for word, _ in a] != [word for word, _ in b]
+        for a, b in zip(single, batch)
+    )
+
+    print(f"📊 批量关键词评分 ({count} 条文本, 每条取前3)")
+    print(f"   仅分词 preprocess_text:  {tokenize_rate:10.0f} 条/s")
+    print(f"   逐条 extract_keywords:   {single_rate:10.0f} 条/s (前 {len(sample)} 条)")
+    print(f"   extract_keywords_batch:  {count / batch_elapsed:10.0f} 条/s (总耗时 {batch_elapsed:.2f}s)")
+    print(f"   与逐条结果不一致: {mismatched} / {len(sample)}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
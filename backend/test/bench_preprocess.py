@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+文本预处理基准
+冷启动：全新进程中第一次调用preprocess_text（含jieba词典加载、停用词构建）
+预热后：warmup()之后每段文本的平均耗时，并与旧版（每次重建停用词集合）对比
+"""
+
+import os
+import re
+import subprocess
+import sys
+import time
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(project_root)
+
+SAMPLE_TEXT = (
+    "由于缺乏明确的用例、合作伙伴关系或社区支持，PROTEST 代币的市场分析非常困难。"
+    "空投抗议的概念可能吸引那些对特定事业充满热情的人，但也可能面临来自监管机构的审查。"
+    "The token launched on pump.fun with low liquidity and high volatility."
+)
+
+COLD_SCRIPT = """
+import sys, time
+sys.path.append({root!r})
+from backend.services.tag_analyzer import preprocess_text
+started = time.perf_counter()
+preprocess_text({text!r})
+print(time.perf_counter() - started)
+"""
+
+
+def legacy_preprocess_text(text):
+    """旧版preprocess_text，每次调用都重建停用词集合"""
+    import jieba
+    import nltk
+    from nltk.corpus import stopwords
+
+    text = re.sub(r'[^一-鿿 a-zA-Z0-9\s,.!?]', '', text)
+    chinese_parts = re.findall(r'[一-鿿]+', text)
+    english_parts = re.findall(r'[a-zA-Z]+', text)
+    chinese_words = []
+    for part in chinese_parts:
+        chinese_words.extend(jieba.lcut(part))
+    english_words = []
+    for part in english_parts:
+        english_words.extend(nltk.word_tokenize(part.lower()))
+    words = chinese_words + english_words
+    stop_words = set(stopwords.words('chinese') + stopwords.words('english'))
+    return [word for word in words if word not in stop_words and word.strip()]
+
+
+def measure_cold() -> float:
+    output = subprocess.check_output(
+        [sys.executable, "-c", COLD_SCRIPT.format(root=project_root, text=SAMPLE_TEXT)],
+        cwd=project_root,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    return float(output.strip().splitlines()[-1])
+
+
+def measure_warm(func, number: int) -> float:
+    started = time.perf_counter()
+    for _ in range(number):
+        func(SAMPLE_TEXT)
+    return (time.perf_counter() - started) / number
+
+
+def run(number: int = 500):
+    from backend.services.tag_analyzer import preprocess_text, warmup
+
+    cold = measure_cold()
+    warmup()
+    assert preprocess_text(SAMPLE_TEXT) == legacy_preprocess_text(SAMPLE_TEXT)
+    warm = measure_warm(preprocess_text, number)
+    legacy = measure_warm(legacy_preprocess_text, number)
+
+    print(f"📊 preprocess_text 单段文本耗时 ({len(SAMPLE_TEXT)} 字符)")
+    print(f"   冷启动首次调用: {cold * 1000:.1f} ms")
+    print(f"   预热后: {warm * 1000:.3f} ms/段")
+    print(f"   旧版(预热后，每次重建停用词): {legacy * 1000:.3f} ms/段")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+公钥编码基准
+模拟连环发币者：mint/bonding_curve每次都是新地址，user/creator按命中率从地址池中复用
+对比每个事件4次编码的耗时（无缓存 vs LRU缓存）
+"""
+
+import os
+import random
+import sys
+import time
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(project_root)
+
+from backend.utils.pubkey import encode_pubkey, encode_pubkey_cached, pubkey_cache_info
+
+
+def make_events(count: int, hit_rate: float, pool_size: int = 500):
+    """生成事件的4个原始公钥，creator/user以hit_rate的概率来自已出现过的地址池"""
+    pool = [os.urandom(32) for _ in range(pool_size)]
+    seen = []
+    events = []
+    for _ in range(count):
+        if seen and random.random() < hit_rate:
+            creator = random.choice(seen)
+        else:
+            creator = pool.pop() if pool else os.urandom(32)
+            seen.append(creator)
+        events.append((os.urandom(32), os.urandom(32), creator, creator))
+    return events
+
+
+def encode_uncached(events):
+    for mint, bonding_curve, user, creator in events:
+        encode_pubkey(mint)
+        encode_pubkey(bonding_curve)
+        encode_pubkey(user)
+        encode_pubkey(creator)
+
+
+def encode_cached(events):
+    for mint, bonding_curve, user, creator in events:
+        encode_pubkey(mint)
+        encode_pubkey(bonding_curve)
+        encode_pubkey_cached(user)
+        encode_pubkey_cached(creator)
+
+
+def run(count: int = 20000):
+    print(f"📊 每事件公钥编码耗时 ({count} 个事件)")
+    for hit_rate in (0.0, 0.5, 0.8, 0.95):
+        events = make_events(count, hit_rate)
+
+        start = time.perf_counter()
+        encode_uncached(events)
+        uncached = time.perf_counter() - start
+
+        encode_pubkey_cached.cache_clear()
+        start = time.perf_counter()
+        encode_cached(events)
+        cached = time.perf_counter() - start
+        info = pubkey_cache_info()
+
+        print(f"   creator复用率 {hit_rate:.0%}: 无缓存 {uncached / count * 1e6:.2f} µs, "
+              f"缓存 {cached / count * 1e6:.2f} µs, 实际命中率 {info['hit_rate']:.1%}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+SERP解析基准
+对 fixtures/serp 下的每个页面，分别用已安装的解析后端（selectolax / lxml / bs4）解析，报告每页解析耗时
+
+用法:
+    python backend/test/bench_serp_parse.py [每页重复次数，默认200]
+
+测试页面是按Google基础版结果页结构合成的，见 fixtures/serp/README.md
+"""
+
+import os
+import sys
+import timeit
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(project_root)
+
+from backend.serp_extractor import EXTRACTORS, available_extractors
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "serp")
+
+
+def load_pages():
+    pages = []
+    for name in sorted(os.listdir(FIXTURES_DIR)):
+        if name.endswith(".html"):
+            with open(os.path.join(FIXTURES_DIR, name), "r", encoding="utf-8") as f:
+                pages.append((name, f.read()))
+    return pages
+
+
+def run(number: int = 200):
+    pages = load_pages()
+    backends = available_extractors()
+    print(f"📊 SERP解析耗时 (ms/页, 每页 {number} 次取平均)")
+    print(f"   {'页面':<28}{'大小':>8}" + "".join(f"{backend:>12}" for backend in backends))
+
+    totals = {backend: 0.0 for backend in backends}
+    for name, html in pages:
+        row = f"   {name:<28}{len(html) // 1024:>6}KB"
+        for backend in backends:
+            extractor = EXTRACTORS[backend]
+            elapsed = timeit.timeit(lambda: extractor(html), number=number) / number * 1000
+            totals[backend] += elapsed
+            row += f"{elapsed:>12.3f}"
+        print(row)
+
+    print(f"   {'平均':<28}{'':>8}" + "".join(f"{totals[backend] / len(pages):>12.3f}" for backend in backends))
+    if "bs4" in totals:
+        for backend in backends:
+            if backend != "bs4":
+                print(f"   {backend} 比 bs4 快 {totals['bs4'] / totals[backend]:.1f} 倍")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
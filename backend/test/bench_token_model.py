@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+代币数据模型基准
+对比摄取/广播热路径上 pydantic TokenData 与 slots TokenRecord 的单代币延迟和内存分配
+热路径 = 由CreateEvent构建 + 广播序列化 + 入队序列化
+"""
+
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+from datetime import datetime
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(project_root)
+
+from backend.models.token import CreateEvent, TokenData, TokenRecord
+
+EVENT = CreateEvent(
+    name="Pepe On Solana",
+    symbol="PEPE",
+    uri="https://ipfs.io/ipfs/QmYwAPJzv5CZsnAzt8auVTLpG1bG6dkprdFM5ocTyBCQb",
+    mint="DztwRrFQF4tbJLxQo9EQ7fk36xQkvoiYwxBLBQW3pump",
+    bonding_curve="8pQhXvCSJd9vbLqy5FTVRbEsGGvmLFRYxtbn5J5HMzCn",
+    user="6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P",
+    creator="6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P",
+    timestamp=1642723200,
+    virtual_token_reserves=1073000000000000,
+    virtual_sol_reserves=30000000000,
+    real_token_reserves=793100000000000,
+    token_total_supply=1000000000000000,
+)
+
+
+def build_pydantic() -> TokenData:
+    """旧版TokenMonitor._convert_to_token_data"""
+    return TokenData(
+        name=EVENT.name,
+        symbol=EVENT.symbol,
+        uri=EVENT.uri,
+        mint=EVENT.mint,
+        bonding_curve=EVENT.bonding_curve,
+        user=EVENT.user,
+        creator=EVENT.creator,
+        timestamp=EVENT.timestamp,
+        virtual_token_reserves=EVENT.virtual_token_reserves / 1e6,
+        virtual_sol_reserves=EVENT.virtual_sol_reserves / 1e9,
+        real_token_reserves=EVENT.real_token_reserves / 1e6,
+        token_total_supply=EVENT.token_total_supply / 1e6,
+        created_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    )
+
+
+def hot_path(build):
+    token = build()
+    json.dumps({"type": "new_token", "data": token.to_json_dict()})
+    json.dumps({"token_data": token.to_json_dict()})
+    return token
+
+
+def measure_allocations(build, count: int):
+    """保留count个对象时的内存占用，以及构建+序列化过程中的峰值"""
+    tracemalloc.start()
+    tokens = [hot_path(build) for _ in range(count)]
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tokens
+    return current / count, peak / count
+
+
+def run(number: int = 20000):
+    print(f"📊 单代币热路径 ({number} 次: 构建 + 2次序列化)")
+    for label, build in (("pydantic TokenData", build_pydantic), ("slots TokenRecord", lambda: TokenRecord.from_create_event(EVENT))):
+        elapsed = timeit.timeit(lambda: hot_path(build), number=number)
+        retained, peak = measure_allocations(build, 5000)
+        print(f"   {label:<20} {elapsed / number * 1e6:7.2f} µs/代币, "
+              f"常驻 {retained:7.0f} B/代币, 峰值 {peak:7.0f} B/代币")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
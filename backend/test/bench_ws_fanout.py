@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+/ws 广播扇出压测
+在子进程中启动FastAPI应用（TokenMonitor替换为按固定速率产生代币的假数据源，AIAnalyzer替换为空实现），
+然后连接N个模拟客户端，统计广播延迟 p50/p99、吞吐量和每个连接占用的服务端内存。
+
+用法:
+    python backend/test/bench_ws_fanout.py --clients 100,1000,10000 --rate 20 --duration 15
+
+延迟 = 客户端收到消息的时间 - 假数据源生成代币的时间（写在代币的timestamp字段，单位微秒），
+覆盖摄取缓冲区、编码和ConnectionManager扇出的全过程。
+所有客户端运行在同一个进程中，连接数很大时客户端自身也可能成为瓶颈，需结合CPU占用判断。
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(project_root)
+
+
+# ---------------------------------------------------------------------------
+# 服务端（子进程）
+# ---------------------------------------------------------------------------
+
+class FakeTokenMonitor:
+    """按固定速率产生代币的假数据源，接口与TokenMonitor一致"""
+
+    rate = 10.0
+
+    def __init__(self, on_tokens_detected):
+        self.on_tokens_detected = on_tokens_detected
+        self.is_running = False
+        self.task = None
+
+    async def start_monitoring(self):
+        self.is_running = True
+        self.task = asyncio.create_task(self._produce())
+
+    async def stop_monitoring(self):
+        self.is_running = False
+        if self.task:
+            self.task.cancel()
+
+    async def _produce(self):
+        from backend.models.token import TokenRecord
+
+        interval = 1.0 / self.rate
+        seq = 0
+        while self.is_running:
+            seq += 1
+            token = TokenRecord(
+                name=f"Bench Token {seq}",
+                symbol=f"B{seq % 1000}",
+                uri="https://example.com/meta.json",
+                mint=f"BenchMint{seq:034d}",
+                bonding_curve=f"BenchCurve{seq:033d}",
+                user="6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P",
+                creator="6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P",
+                timestamp=time.time_ns() // 1000,
+                virtual_token_reserves=1073000000.0,
+                virtual_sol_reserves=30.0,
+                real_token_reserves=793100000.0,
+                token_total_supply=1000000000.0,
+                created_at=time.strftime("%Y-%m-%dT%H:%M:%S"),
+            )
+            await self.on_tokens_detected([token])
+            await asyncio.sleep(interval)
+
+
+class NoopAnalyzer:
+    """不调用Gemini的空分析器，只消费分析队列"""
+
+    def __init__(self, message_queue, *args, **kwargs):
+        self.message_queue = message_queue
+        self.is_running = False
+
+    async def initialize(self):
+        pass
+
+    async def start_consumer(self):
+        self.is_running = True
+        while self.is_running:
+            await self.message_queue.get_analysis_task()
+
+    async def stop(self):
+        self.is_running = False
+
+    def get_worker_stats(self):
+        return {}
+
+
+def serve(port: int, rate: float):
+    import uvicorn
+    import backend.main as app_main
+
+    FakeTokenMonitor.rate = rate
+    app_main.TokenMonitor = FakeTokenMonitor
+    app_main.AIAnalyzer = NoopAnalyzer
+    app_main.logger.setLevel("WARNING")
+    uvicorn.run(app_main.app, host="127.0.0.1", port=port, log_level="warning", ws_max_queue=1024)
+
+
+# ---------------------------------------------------------------------------
+# 客户端
+# ---------------------------------------------------------------------------
+
+def read_rss_kb(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def wait_for_server(port: int, timeout: float = 30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1)
+            return
+        except Exception:
+            time.sleep(0.2)
+    raise RuntimeError("服务端启动超时")
+
+
+def fetch_status(port: int) -> dict:
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/status", timeout=5) as resp:
+        return json.loads(resp.read())
+
+
+class ClientStats:
+    def __init__(self):
+        self.measuring = False
+        self.latencies_ms = []
+        self.messages = 0
+
+
+async def run_client(url: str, stats: ClientStats, stop: asyncio.Event, connected: asyncio.Semaphore):
+    import websockets
+
+    async with websockets.connect(url, max_size=None, ping_interval=None) as ws:
+        connected.release()
+        while not stop.is_set():
+            try:
+                raw = await asyncio.wait_for(ws.recv(), timeout=1.0)
+            except asyncio.TimeoutError:
+                continue
+            if not stats.measuring:
+                continue
+            now_us = time.time_ns() // 1000
+            try:
+                message = json.loads(raw)
+            except ValueError:
+                continue
+            if message.get("type") == "new_token":
+                tokens = [message["data"]]
+            elif message.get("type") == "new_tokens":
+                tokens = message["data"]
+            else:
+                continue
+            stats.messages += 1
+            for token in tokens:
+                stats.latencies_ms.append((now_us - token["timestamp"]) / 1000)
+
+
+async def run_clients(port: int, clients: int, duration: float, server_pid: int):
+    url = f"ws://127.0.0.1:{port}/ws"
+    stats = ClientStats()
+    stop = asyncio.Event()
+    connected = asyncio.Semaphore(0)
+
+    rss_before = read_rss_kb(server_pid)
+    tasks = []
+    # 分批建立连接，避免瞬间的握手风暴
+    for start in range(0, clients, 200):
+        batch = min(200, clients - start)
+        tasks.extend(asyncio.create_task(run_client(url, stats, stop, connected)) for _ in range(batch))
+        for _ in range(batch):
+            await connected.acquire()
+    await asyncio.sleep(1.0)
+    rss_after = read_rss_kb(server_pid)
+
+    stats.measuring = True
+    started = time.perf_counter()
+    await asyncio.sleep(duration)
+    stats.measuring = False
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return stats, elapsed, (rss_after - rss_before) / clients
+
+
+def percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def bench(clients: int, rate: float, duration: float, port: int):
+    env = dict(os.environ, REDIS_URL=os.environ.get("BENCH_REDIS_URL", "redis://127.0.0.1:1/0"))
+    server = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--serve", "--port", str(port), "--rate", str(rate)],
+        cwd=project_root,
+        env=env,
+    )
+    try:
+        wait_for_server(port)
+        stats, elapsed, kb_per_conn = asyncio.run(run_clients(port, clients, duration, server.pid))
+        status = fetch_status(port)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+    ws_stats = status.get("websocket") or {}
+    print(f"📊 {clients} 个客户端, 数据源 {rate}/s, 测量 {elapsed:.1f}s")
+    print(f"   广播延迟: p50 {percentile(stats.latencies_ms, 50):.2f} ms, "
+          f"p99 {percentile(stats.latencies_ms, 99):.2f} ms, "
+          f"max {max(stats.latencies_ms, default=0):.2f} ms")
+    print(f"   吞吐量: {stats.messages / elapsed:.0f} 条消息/s (所有客户端合计), "
+          f"{stats.messages / elapsed / clients:.2f} 条/s/客户端")
+    if stats.latencies_ms:
+        print(f"   延迟标准差: {statistics.pstdev(stats.latencies_ms):.2f} ms")
+    print(f"   服务端内存: {kb_per_conn:.1f} KB/连接")
+    print(f"   服务端丢弃消息: {ws_stats.get('dropped_messages', 0)}, 慢客户端断开: {ws_stats.get('slow_disconnects', 0)}")
+
+
+def raise_fd_limit():
+    """万级连接需要足够的文件描述符"""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/ws 广播扇出压测")
+    parser.add_argument("--clients", default="100,1000", help="客户端数量，逗号分隔可依次测试多组")
+    parser.add_argument("--rate", type=float, default=10.0, help="假数据源每秒产生的代币数")
+    parser.add_argument("--duration", type=float, default=10.0, help="每组测量时长(秒)")
+    parser.add_argument("--port", type=int, default=18765)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    raise_fd_limit()
+    if args.serve:
+        serve(args.port, args.rate)
+        return
+
+    for clients in (int(n) for n in args.clients.split(",")):
+        bench(clients, args.rate, args.duration, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+测试CreateEvent解码器
+使用构造的程序数据验证各字段解析和边界检查
+"""
+
+import base64
+import os
+import struct
+import sys
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(project_root)
+
+from backend.services.event_decoder import MIN_CREATE_EVENT_SIZE, decode_create_event, iter_create_events
+
+# pump.fun程序地址的原始32字节，用作公钥样例
+PUMP_PROGRAM_BYTES = bytes.fromhex("0156e0f693665acf44db1568bf175baa5189cb97f5d2ff3b655d2bb6fd6d18b0")
+PUMP_PROGRAM_ID = "6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P"
+
+
+def build_create_event_payload(name="Test Token", symbol="TEST", uri="https://example.com",
+                               mint=PUMP_PROGRAM_BYTES, bonding_curve=PUMP_PROGRAM_BYTES,
+                               user=PUMP_PROGRAM_BYTES, creator=PUMP_PROGRAM_BYTES,
+                               timestamp=1642723200,
+                               reserves=(1073000000000000, 30000000000, 793100000000000, 1000000000000000)) -> bytes:
+    """按链上布局构造CreateEvent原始数据"""
+    parts = [b"\x1b\x72\xa9\x4d\xde\xeb\x63\x76"]
+    for text in (name, symbol, uri):
+        encoded = text.encode("utf-8")
+        parts.append(struct.pack("<I", len(encoded)))
+        parts.append(encoded)
+    parts.extend([mint, bonding_curve, user, creator])
+    parts.append(struct.pack("<qQQQQ", timestamp, *reserves))
+    return b"".join(parts)
+
+
+def test_decode_create_event():
+    """测试完整事件解析"""
+    raw = build_create_event_payload()
+    assert len(raw) >= MIN_CREATE_EVENT_SIZE
+
+    event = decode_create_event(raw)
+    assert event.name == "Test Token"
+    assert event.symbol == "TEST"
+    assert event.uri == "https://example.com"
+    assert event.mint == PUMP_PROGRAM_ID
+    assert event.creator == PUMP_PROGRAM_ID
+    assert event.timestamp == 1642723200
+    assert event.virtual_token_reserves == 1073000000000000
+    assert event.virtual_sol_reserves == 30000000000
+    assert event.real_token_reserves == 793100000000000
+    assert event.token_total_supply == 1000000000000000
+
+
+def test_decode_from_base64_memoryview():
+    """测试直接解析base64解码结果的memoryview"""
+    b64 = base64.b64encode(build_create_event_payload(symbol="币")).decode()
+    event = decode_create_event(memoryview(base64.b64decode(b64)))
+    assert event.symbol == "币"
+
+
+def test_decode_truncated_payload():
+    """测试数据不足时抛出ValueError"""
+    raw = build_create_event_payload()
+    for cut in (10, 40, len(raw) - 1):
+        try:
+            decode_create_event(raw[:cut])
+        except ValueError:
+            continue
+        raise AssertionError(f"截断到 {cut} 字节时应当失败")
+
+
+def test_iter_create_events_batch():
+    """测试一条通知中打包多个CreateEvent时全部被解析"""
+    def program_data(raw: bytes) -> str:
+        return "Program data: " + base64.b64encode(raw).decode()
+
+    logs = [
+        "Program 6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P invoke [1]",
+        "Program log: Instruction: InitializeMint2",
+        program_data(build_create_event_payload(symbol="AAA")),
+        "Program data: vdt/" + "A" * 260,
+        program_data(b"\x00" * 16),
+        "Program data: !!!not-base64!!!",
+        program_data(build_create_event_payload(symbol="BBB")),
+    ]
+    assert [event.symbol for event in iter_create_events(logs)] == ["AAA", "BBB"]
+
+
+def test_monitor_frame_stats():
+    """测试监控器的帧统计：不含创建指令的帧被预过滤跳过，其余帧解码出的事件计入统计"""
+    import asyncio
+    import json
+
+    pytest.importorskip("websockets")
+    from backend.services.token_monitor import TokenMonitor
+
+    detected = []
+
+    async def on_tokens_detected(batch):
+        detected.extend(batch)
+
+    def notification(logs):
+        return json.dumps({"params": {"result": {"value": {"logs": logs}}}})
+
+    create_logs = [
+        "Program log: Instruction: InitializeMint2",
+        "Program data: " + base64.b64encode(build_create_event_payload(symbol="AAA")).decode(),
+    ]
+
+    async def run():
+        monitor = TokenMonitor(on_tokens_detected)
+        await monitor._on_message(notification(["Program log: Instruction: Buy"]))
+        await monitor._on_message(notification(create_logs).encode())
+        await monitor._on_message(notification(["Program log: Instruction: Sell"]))
+        return monitor.get_stats()
+
+    stats = asyncio.run(run())
+    assert [token.symbol for token in detected] == ["AAA"]
+    assert stats["frames_received"] == 3 and stats["frames_skipped"] == 2
+    assert stats["frames_decoded"] == 1 and stats["events_decoded"] == 1
+    assert stats["skip_ratio"] == round(2 / 3, 4)
+
+
+if __name__ == "__main__":
+    test_decode_create_event()
+    test_decode_from_base64_memoryview()
+    test_decode_truncated_payload()
+    test_iter_create_events_batch()
+    test_monitor_frame_stats()
+    print("✅ CreateEvent解码测试通过")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+测试摄取缓冲区
+验证三种溢出策略和统计指标
+"""
+
+import asyncio
+import os
+import sys
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(project_root)
+
+from backend.services.ingest_buffer import BLOCK, DROP_NEWEST, DROP_OLDEST, IngestBuffer
+
+
+def test_drop_oldest():
+    async def run():
+        buffer = IngestBuffer(capacity=3, overflow_policy=DROP_OLDEST)
+        await buffer.put_many(range(5))
+        assert await buffer.get_batch() == [2, 3, 4]
+        stats = buffer.get_stats()
+        assert stats["dropped_oldest"] == 2
+        assert stats["depth"] == 0
+        assert stats["max_depth"] == 3
+
+    asyncio.run(run())
+
+
+def test_drop_newest():
+    async def run():
+        buffer = IngestBuffer(capacity=3, overflow_policy=DROP_NEWEST)
+        await buffer.put_many(range(5))
+        assert await buffer.get_batch(max_items=2) == [0, 1]
+        assert await buffer.get_batch() == [2]
+        assert buffer.get_stats()["dropped_newest"] == 2
+
+    asyncio.run(run())
+
+
+def test_block_until_consumed():
+    async def run():
+        buffer = IngestBuffer(capacity=2, overflow_policy=BLOCK)
+        producer = asyncio.create_task(buffer.put_many(range(4)))
+        await asyncio.sleep(0)
+        assert not producer.done()
+
+        received = []
+        while len(received) < 4:
+            received.extend(await buffer.get_batch())
+        await producer
+        assert received == [0, 1, 2, 3]
+        stats = buffer.get_stats()
+        assert stats["blocked_puts"] == 1
+        assert stats["dropped_oldest"] == stats["dropped_newest"] == 0
+
+    asyncio.run(run())
+
+
+def test_block_with_waiting_consumer():
+    async def run():
+        buffer = IngestBuffer(capacity=2, overflow_policy=BLOCK)
+        received = []
+
+        async def consume():
+            while len(received) < 3:
+                received.extend(await buffer.get_batch())
+
+        # 消费者先进入等待，再写入超过容量的一批
+        consumer = asyncio.create_task(consume())
+        await asyncio.sleep(0)
+        await asyncio.wait_for(buffer.put_many(range(3)), timeout=1)
+        await asyncio.wait_for(consumer, timeout=1)
+        assert received == [0, 1, 2]
+        assert buffer.get_stats()["blocked_puts"] == 1
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_drop_oldest()
+    test_drop_newest()
+    test_block_until_consumed()
+    test_block_with_waiting_consumer()
+    print("✅ 摄取缓冲区测试通过")
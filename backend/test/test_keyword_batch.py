@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+测试批量关键词提取
+用一个小的内存模型对比 extract_keywords_batch 与逐条调用 extract_keywords 的结果，
+覆盖优先级关键词、同分排序和空文本/全停用词文本
+"""
+
+import math
+import os
+import pickle
+import sys
+import tempfile
+from collections import Counter
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(project_root)
+
+pytest.importorskip("numpy")
+pytest.importorskip("scipy")
+
+from backend.services.keyword_model import KeywordModel
+from backend.services.tag_analyzer import extract_keywords, extract_keywords_batch, preprocess_text
+
+# 分词依赖NLTK的停用词和punkt数据，未下载时跳过
+try:
+    preprocess_text("check nltk data")
+except LookupError:
+    pytest.skip("未下载NLTK停用词/punkt数据", allow_module_level=True)
+
+# doge 的语料权重 (1+8) 等于 moon 的 (1+2) 乘以优先级权重 3，两者理论上同分；
+# 浮点乘法顺序不同时结果会差最后一位，用来检验批量版与逐条版的加权顺序一致
+WORD_FREQ = Counter({"pepe": 4, "moon": 2, "doge": 8, "wif": 2, "hat": 2, "solana": 1})
+IDF = {"pepe": 1.2, "moon": 1.5, "doge": 1.5, "wif": 2.0, "hat": 2.0}
+DEFAULT_IDF = 2.5
+PRIORITY_KEYWORDS = ["moon", "pump"]
+
+TEXTS = [
+    "pepe moon doge",
+    "wif hat",  # 同分，按字典序排列
+    "moon moon doge doge pepe unseen",
+    "",
+    "the a is",  # 全部是停用词
+    "pump solana 社区 社区 叙事",
+    "hat wif zebra apple pepe pepe pepe moon doge solana",
+]
+
+
+def write_model(directory):
+    path = os.path.join(directory, "keyword_model.pkl")
+    with open(path, "wb") as f:
+        pickle.dump({"word_freq": WORD_FREQ, "idf": IDF, "default_idf": DEFAULT_IDF, "n_docs": 10}, f)
+    return path
+
+
+def scalar_results(path, n):
+    model = KeywordModel(path)
+    model.load()
+    return [
+        extract_keywords(text, n=n, priority_keywords=PRIORITY_KEYWORDS,
+                         corpus_keywords=model.get(), idf=model.idf, default_idf=model.default_idf)
+        for text in TEXTS
+    ]
+
+
+def assert_same(batch, single):
+    assert len(batch) == len(single)
+    for batch_row, single_row in zip(batch, single):
+        assert [word for word, _ in batch_row] == [word for word, _ in single_row]
+        for (_, batch_score), (_, single_score) in zip(batch_row, single_row):
+            assert math.isclose(batch_score, single_score, rel_tol=1e-12)
+
+
+def test_batch_matches_single():
+    with tempfile.TemporaryDirectory() as directory:
+        path = write_model(directory)
+        for n in (1, 3, 10):
+            batch = extract_keywords_batch(TEXTS, n=n, priority_keywords=PRIORITY_KEYWORDS, model_path=path)
+            assert_same(batch, scalar_results(path, n))
+
+
+def test_priority_ties_and_empty_rows():
+    with tempfile.TemporaryDirectory() as directory:
+        batch = extract_keywords_batch(TEXTS, n=10, priority_keywords=PRIORITY_KEYWORDS, model_path=write_model(directory))
+
+    # 优先级关键词按语料权重之后再乘3，与 extract_keywords 相同
+    assert [word for word, _ in batch[0]][:2] == ["moon", "doge"]
+    # 同分的词按字典序排列
+    assert dict(batch[1])["hat"] == dict(batch[1])["wif"]
+    assert [word for word, _ in batch[1]] == ["hat", "wif"]
+    # 空文本和全停用词文本没有关键词
+    assert batch[3] == [] and batch[4] == []
+    # 不在语料库中的优先级关键词不加权
+    assert dict(batch[5])["pump"] < dict(batch[5])["solana"]
+
+
+def test_empty_input():
+    with tempfile.TemporaryDirectory() as directory:
+        path = write_model(directory)
+        assert extract_keywords_batch([], model_path=path) == []
+        assert extract_keywords_batch(["", "the a is"], model_path=path) == [[], []]
+
+
+if __name__ == "__main__":
+    test_batch_matches_single()
+    test_priority_ties_and_empty_rows()
+    test_empty_input()
+    print("✅ 批量关键词提取测试通过")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+测试关键词评分
+验证预训练IDF表的解析（新旧两种模型格式），以及字典查询版TF-IDF与 sklearn TfidfVectorizer 的一致性
+"""
+
+import math
+import os
+import sys
+from collections import Counter
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(project_root)
+
+from backend.services.keyword_model import parse_keyword_model
+from backend.services.tag_analyzer import tfidf_scores
+
+SAMPLE_TEXTS = [
+    "pepe pepe moon 项目 空投 sol",
+    "solana meme coin 社区 社区 叙事 pump",
+    "dog dog dog wif hat",
+]
+
+
+def test_parse_legacy_counter():
+    word_freq, idf, default_idf, n_docs = parse_keyword_model(Counter({"项目": 3, "pepe": 1}))
+    assert word_freq["项目"] == 3
+    assert idf == {} and default_idf == 1.0 and n_docs == 0
+
+
+def test_parse_idf_model():
+    model = {"word_freq": Counter({"pepe": 2}), "idf": {"pepe": 1.5}, "default_idf": 2.0, "n_docs": 3}
+    word_freq, idf, default_idf, n_docs = parse_keyword_model(model)
+    assert word_freq["pepe"] == 2
+    assert idf == {"pepe": 1.5} and default_idf == 2.0 and n_docs == 3
+
+
+def test_load_idf_model_file():
+    """从磁盘加载新格式模型，IDF取值与训练脚本的平滑公式一致"""
+    import pickle
+    import tempfile
+
+    from backend.services.keyword_model import KeywordModel
+
+    # 3篇文档：pepe出现在3篇中，moon出现在1篇中
+    n_docs = 3
+    idf = {"pepe": math.log(4 / 4) + 1, "moon": math.log(4 / 2) + 1}
+    model = {"word_freq": Counter({"pepe": 5, "moon": 1}), "idf": idf, "default_idf": math.log(4) + 1, "n_docs": n_docs}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "keyword_model.pkl")
+        with open(path, "wb") as f:
+            pickle.dump(model, f)
+
+        keyword_model = KeywordModel(path)
+        keyword_model.load()
+
+    assert keyword_model.get()["pepe"] == 5
+    assert keyword_model.idf["pepe"] == 1.0
+    assert math.isclose(keyword_model.idf["moon"], 1 + math.log(2))
+    assert math.isclose(keyword_model.default_idf, 1 + math.log(4))
+    assert keyword_model.get_stats()["idf_size"] == 2 and keyword_model.get_stats()["n_docs"] == 3
+
+    # 出现在所有文档中的词权重最低，未登录词权重最高
+    scores = tfidf_scores("pepe moon unseen", keyword_model.idf, keyword_model.default_idf)
+    assert scores["pepe"] < scores["moon"] < scores["unseen"]
+
+
+def test_idf_weighting():
+    scores = tfidf_scores("pepe pepe moon", {"pepe": 1.0, "moon": 3.0})
+    assert scores["moon"] > scores["pepe"]
+    assert math.isclose(sum(v * v for v in scores.values()), 1.0)
+
+
+def test_matches_single_document_vectorizer():
+    """旧模型（无IDF）的评分必须与旧实现的单文档 TfidfVectorizer 完全一致"""
+    try:
+        from sklearn.feature_extraction.text import TfidfVectorizer
+    except ImportError:
+        print("⚠️ 未安装sklearn，跳过一致性对比")
+        return
+
+    for text in SAMPLE_TEXTS:
+        vectorizer = TfidfVectorizer()
+        row = vectorizer.fit_transform([text]).toarray()[0]
+        expected = dict(zip(vectorizer.get_feature_names_out(), row))
+        actual = tfidf_scores(text, {})
+        assert list(actual) == list(expected)
+        for word, score in expected.items():
+            assert math.isclose(actual[word], score, rel_tol=1e-9)
+
+
+if __name__ == "__main__":
+    test_parse_legacy_counter()
+    test_parse_idf_model()
+    test_load_idf_model_file()
+    test_idf_weighting()
+    test_matches_single_document_vectorizer()
+    print("✅ 关键词评分测试通过")
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+测试自适应限流器（进程内令牌桶）
+验证令牌桶的突发和匀速放行、被限流时减半（冷却期内只减一次）、正常响应时加性恢复，以及限流响应识别。
+使用假时钟，不依赖真实的等待时间
+"""
+
+import asyncio
+import math
+import os
+import sys
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(project_root)
+
+from backend.services.rate_limiter import AdaptiveRateLimiter, is_throttled_response
+
+
+class FakeClock:
+    """假时钟：同步sleep推进时间；异步sleep只记录等待时间并让出事件循环，时间由测试手动推进"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    async def async_sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        await asyncio.sleep(0)
+
+
+def make_limiter(clock: FakeClock, **kwargs) -> AdaptiveRateLimiter:
+    return AdaptiveRateLimiter(clock=clock, sleep=clock.sleep, async_sleep=clock.async_sleep, **kwargs)
+
+
+def assert_waits(actual, expected):
+    assert len(actual) == len(expected), actual
+    for a, e in zip(actual, expected):
+        assert math.isclose(a, e, abs_tol=1e-9), actual
+
+
+def test_token_bucket_pacing():
+    async def run():
+        clock = FakeClock()
+        limiter = make_limiter(clock, rate=20.0, burst=2.0)
+
+        # 同一时刻的6个请求：前2个使用突发额度立即放行，之后每 1/20 秒放行一个
+        waits = await asyncio.gather(*[limiter.acquire() for _ in range(6)])
+        assert_waits(sorted(waits), [0.0, 0.0, 0.05, 0.10, 0.15, 0.20])
+        assert_waits(clock.sleeps, [0.05, 0.10, 0.15, 0.20])
+        assert limiter.get_stats()["acquired"] == 6
+
+        # 空闲足够久后令牌补满，但不超过桶容量
+        clock.advance(10)
+        assert_waits([await limiter.acquire() for _ in range(3)], [0.0, 0.0, 0.05])
+
+    asyncio.run(run())
+
+
+def test_blocking_acquire_shares_bucket():
+    clock = FakeClock()
+    limiter = make_limiter(clock, rate=20.0, burst=1.0)
+    waits = [limiter.acquire_blocking() for _ in range(3)]
+    assert_waits(waits, [0.0, 0.05, 0.05])
+    assert math.isclose(clock.now, 0.10)
+
+
+def test_throttle_halves_rate_once_per_cooldown():
+    async def run():
+        clock = FakeClock()
+        limiter = make_limiter(clock, rate=4.0, min_rate=0.5, recovery_step=0.5, cooldown=60)
+        await limiter.report(throttled=True)
+        clock.advance(30)
+        await limiter.report(throttled=True)  # 冷却期内的并发限流不再继续减半
+        assert limiter.rate == 2.0
+        assert limiter.get_stats()["throttled"] == 2
+
+        clock.advance(30)
+        await limiter.report(throttled=True)  # 冷却期结束后再次限流，继续减半
+        assert limiter.rate == 1.0
+
+        for _ in range(10):
+            await limiter.report(throttled=False)
+        assert limiter.rate == 4.0  # 恢复到初始速率为止
+
+    asyncio.run(run())
+
+
+def test_min_rate_floor():
+    limiter = make_limiter(FakeClock(), rate=1.0, min_rate=0.4, cooldown=0)
+    for _ in range(5):
+        limiter.report_blocking(throttled=True)
+    assert limiter.rate == 0.4
+
+
+def test_throttled_response_detection():
+    results_page = "<div class='ezO2md'>Our systems have detected unusual traffic patterns in DeFi</div>"
+    assert is_throttled_response(429, "https://www.google.com/search?q=pepe", "")
+    assert is_throttled_response(200, "https://www.google.com/sorry/index?continue=https://www.google.com/search", "")
+    assert is_throttled_response(200, "https://www.google.com/search", "Our systems have detected Unusual Traffic from your computer network.")
+    assert not is_throttled_response(200, "https://www.google.com/search?q=pepe", "<div class='ezO2md'></div>")
+    # 正常结果页中恰好出现这段文字，或查询词里包含 /sorry/，都不算限流
+    assert not is_throttled_response(200, "https://www.google.com/search?q=unusual+traffic", results_page)
+    assert not is_throttled_response(200, "https://www.google.com/search?q=/sorry/", "<div class='ezO2md'></div>")
+
+
+if __name__ == "__main__":
+    test_token_bucket_pacing()
+    test_blocking_acquire_shares_bucket()
+    test_throttle_halves_rate_once_per_cooldown()
+    test_min_rate_floor()
+    test_throttled_response_detection()
+    print("✅ 自适应限流器测试通过")
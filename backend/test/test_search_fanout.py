@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+测试异步搜索的并发查询
+用假的 _async_req 代替网络请求，验证多个查询并发发出、按URL去重，以及凑够结果后取消其余查询
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(project_root)
+
+import backend.google_engine as google_engine
+import backend.services.search_cache as search_cache
+
+
+def build_page(urls):
+    blocks = "".join(
+        f'<div class="ezO2md"><a href="/url?q={url}&sa=U"><span class="CVA68e">{url}</span></a>'
+        f'<span class="FrIlee">desc</span></div>'
+        for url in urls
+    )
+    return f"<html><body>{blocks}</body></html>"
+
+
+class FakeSearch:
+    """按查询词返回固定结果页，记录请求和取消情况"""
+
+    def __init__(self, pages, delay=0.05):
+        self.pages = pages
+        self.delay = delay
+        self.started = []
+        self.cancelled = 0
+
+    async def __call__(self, term, results, lang, start, proxy, timeout, safe, ssl_verify, region):
+        self.started.append((term, start))
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return build_page(self.pages[term].get(start, []))
+
+
+def run_fanout(fake, num_results, mint="Mint", cache=None):
+    """用假的请求函数运行一次并发搜索；默认每次使用新的进程内缓存，结束后恢复被替换的全局对象"""
+    original_cache = search_cache._search_cache
+    original_req = google_engine._async_req
+    search_cache._search_cache = cache or search_cache.SearchCache()
+    google_engine._async_req = fake
+    try:
+        return asyncio.run(google_engine.async_search_crypto_info("PEPE", mint, num_results))
+    finally:
+        search_cache._search_cache = original_cache
+        google_engine._async_req = original_req
+
+
+def test_queries_run_concurrently_and_dedupe():
+    first, second = google_engine.crypto_queries("PEPE", "Mint")
+    fake = FakeSearch({
+        first: {0: ["https://a.com/1", "https://shared.com"]},
+        second: {0: ["https://shared.com", "https://b.com/1"]},
+    })
+    results = run_fanout(fake, num_results=10)
+    urls = [result.url for result in results]
+    assert sorted(urls) == ["https://a.com/1", "https://b.com/1", "https://shared.com"]
+    # 两个查询的第一页同时发出
+    assert {term for term, start in fake.started[:2]} == {first, second}
+
+
+def test_cancel_once_enough_results():
+    first, second = google_engine.crypto_queries("PEPE", "Mint")
+    # 每页3条，单个查询需要翻页才能凑够6条
+    fake = FakeSearch({
+        first: {0: [f"https://a.com/{i}" for i in range(3)], 10: [f"https://a.com/p2/{i}" for i in range(3)]},
+        second: {0: [f"https://b.com/{i}" for i in range(3)], 10: [f"https://b.com/p2/{i}" for i in range(3)]},
+    })
+    results = run_fanout(fake, num_results=6)
+    assert len(results) == 6
+    assert {result.url for result in results} == {f"https://{host}/{i}" for host in ("a.com", "b.com") for i in range(3)}
+    # 两个查询的第一页已经凑够结果，进行中的翻页请求被取消
+    assert fake.cancelled == 2
+
+
+def test_symbol_query_cached_across_mints():
+    cache = search_cache.SearchCache()
+    symbol_query, first_mint_query = google_engine.crypto_queries("PEPE", "MintA")
+    _, second_mint_query = google_engine.crypto_queries("PEPE", "MintB")
+    fake = FakeSearch({
+        symbol_query: {0: ["https://pepe.com"]},
+        first_mint_query: {0: ["https://a.com"]},
+        second_mint_query: {0: []},
+    })
+    run_fanout(fake, num_results=10, mint="MintA", cache=cache)
+    first_run_requests = len(fake.started)
+    results = run_fanout(fake, num_results=10, mint="MintB", cache=cache)
+
+    # 第二个代币只请求了自己的mint查询，符号查询命中缓存
+    assert {term for term, _ in fake.started[first_run_requests:]} == {second_mint_query}
+    assert [result.url for result in results] == ["https://pepe.com"]
+    stats = cache.get_stats()
+    assert stats["memory_hits"] == 1 and stats["misses"] == 3
+    assert stats["negative_stores"] == 1  # 第二个代币的mint查询没有结果，短期缓存
+
+
+def test_failed_query_not_cached():
+    cache = search_cache.SearchCache()
+
+    async def failing(*args):
+        raise RuntimeError("429 Too Many Requests")
+
+    assert run_fanout(failing, num_results=6, cache=cache) == []
+    assert cache.get_stats()["stores"] == 0 and cache.get_stats()["negative_stores"] == 0
+
+
+def test_globals_restored():
+    original_cache = search_cache._search_cache
+    original_req = google_engine._async_req
+    run_fanout(FakeSearch({term: {0: []} for term in google_engine.crypto_queries("PEPE", "Mint")}), num_results=6)
+    assert search_cache._search_cache is original_cache
+    assert google_engine._async_req is original_req
+
+
+def test_session_does_not_keep_response_cookies():
+    """共享会话不保存Google下发的Cookie，每个请求只带固定的同意Cookie"""
+    web = pytest.importorskip("aiohttp.web")
+    received = []
+
+    async def handler(request):
+        received.append(dict(request.cookies))
+        response = web.Response(text=build_page([]))
+        response.set_cookie("NID", "session-identity")
+        return response
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/search", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        original_url = google_engine.SEARCH_URL
+        # 用主机名访问：aiohttp默认的CookieJar不保存来自IP地址的Cookie
+        google_engine.SEARCH_URL = f"http://localhost:{port}/search"
+        try:
+            for _ in range(2):
+                await google_engine._async_req("pepe", 10, "en", 0, None, 5, "active", None, None)
+        finally:
+            google_engine.SEARCH_URL = original_url
+            await google_engine.close_session()
+            await runner.cleanup()
+
+    asyncio.run(run())
+    assert received == [google_engine.SEARCH_COOKIES, google_engine.SEARCH_COOKIES]
+
+
+if __name__ == "__main__":
+    test_queries_run_concurrently_and_dedupe()
+    test_cancel_once_enough_results()
+    test_symbol_query_cached_across_mints()
+    test_failed_query_not_cached()
+    test_globals_restored()
+    test_session_does_not_keep_response_cookies()
+    print("✅ 并发搜索测试通过")
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+测试SERP解析后端一致性
+每个已安装的解析后端（selectolax / lxml / bs4）对 fixtures/serp 下每个页面的解析结果都必须与 expected.json 一致
+"""
+
+import json
+import os
+import sys
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(project_root)
+
+from backend.serp_extractor import EXTRACTORS, available_extractors, clean_link
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "serp")
+
+
+def load_fixtures():
+    with open(os.path.join(FIXTURES_DIR, "expected.json"), "r", encoding="utf-8") as f:
+        expected = json.load(f)
+    for name, results in expected.items():
+        with open(os.path.join(FIXTURES_DIR, name), "r", encoding="utf-8") as f:
+            yield name, f.read(), [tuple(result) for result in results]
+
+
+def test_backends_match_expected():
+    backends = available_extractors()
+    assert backends, "没有可用的SERP解析后端"
+    for name, html, expected in load_fixtures():
+        for backend in backends:
+            assert EXTRACTORS[backend](html) == expected, f"{backend} 解析 {name} 的结果不一致"
+    print(f"   已验证后端: {', '.join(backends)}")
+
+
+def test_expected_counts():
+    counts = {name: len(expected) for name, _, expected in load_fixtures()}
+    assert counts["pepe_cryptocurrency.html"] == 10  # 广告块被跳过
+    assert counts["no_results.html"] == 0
+    assert counts["large_num50.html"] == 50
+
+
+def test_empty_page():
+    for backend in available_extractors():
+        assert EXTRACTORS[backend]("") == []
+
+
+def test_clean_link():
+    href = "/url?q=https://x.com/search%3Fq%3D%2524PEPE%26src%3Dtyped_query&sa=U&ved=2ahUKEwj"
+    assert clean_link(href) == "https://x.com/search?q=%24PEPE&src=typed_query"
+
+
+if __name__ == "__main__":
+    test_backends_match_expected()
+    test_expected_counts()
+    test_empty_page()
+    test_clean_link()
+    print("✅ SERP解析测试通过")
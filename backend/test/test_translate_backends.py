@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+测试翻译后端（不访问网络）
+验证离线词典优先、只有未命中的词交给网络后端、网络结果写入缓存、单个词失败不影响其他词，以及全部失败时返回原词
+"""
+
+import asyncio
+import os
+import sys
+from contextlib import contextmanager
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(project_root)
+
+import backend.services.translate as translate
+import backend.services.translation_cache as translation_cache
+from backend.services.translate import (
+    DictionaryBackend,
+    GoogleTranslateBackend,
+    TranslationBackend,
+    set_translation_backends,
+    translate_english_many,
+    translate_text,
+)
+
+
+class FakeNetworkBackend(TranslationBackend):
+    """模拟网络翻译后端，记录每次批量请求"""
+
+    name = "fake"
+    cacheable = True
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.calls = []
+
+    async def translate_many(self, words, src, dest):
+        self.calls.append(list(words))
+        if self.fail:
+            return {}
+        return {word: f"en:{word}" for word in words}
+
+
+@contextmanager
+def isolated_translation(backends):
+    """临时替换翻译后端，并使用一个新的纯内存翻译缓存（不写磁盘），结束后恢复全局状态"""
+    saved_backends = translate._backends
+    saved_cache = translation_cache._translation_cache
+    cache = translation_cache.TranslationCache(None)
+    translation_cache._translation_cache = cache
+    set_translation_backends(backends)
+    try:
+        yield cache
+    finally:
+        translate._backends = saved_backends
+        translation_cache._translation_cache = saved_cache
+
+
+def test_bundled_dictionary():
+    backend = DictionaryBackend()
+    assert "空投" in backend
+    result = asyncio.run(backend.translate_many(["空投", "不存在的词"], "zh-cn", "en"))
+    assert result == {"空投": "airdrop"}
+    assert asyncio.run(backend.translate_many(["空投"], "en", "zh-cn")) == {}
+
+
+def test_dictionary_first_then_batched_network():
+    network = FakeNetworkBackend()
+    with isolated_translation([DictionaryBackend(entries={"项目": "project"}), network]) as cache:
+        result = asyncio.run(translate_english_many(["项目", "未知词一", "pepe", "未知词二", "未知词一"]))
+        assert result == {"项目": "project", "未知词一": "en:未知词一", "pepe": "pepe", "未知词二": "en:未知词二"}
+        assert network.calls == [["未知词一", "未知词二"]]
+
+        # 第二次命中缓存，不再请求网络
+        asyncio.run(translate_english_many(["未知词一", "未知词二"]))
+        assert len(network.calls) == 1
+        assert cache.get_stats()["hits"] == 2
+
+
+def test_failure_returns_original_word():
+    network = FakeNetworkBackend(fail=True)
+    with isolated_translation([DictionaryBackend(entries={}), network]):
+        assert asyncio.run(translate_text("翻不出来")) == "翻不出来"
+        # 失败不写入缓存，下次仍会重试
+        assert asyncio.run(translate_text("翻不出来")) == "翻不出来"
+        assert len(network.calls) == 2
+
+
+class FakeTranslator:
+    """模拟googletrans的Translator：逐词翻译，指定的词抛出异常，记录最大并发数"""
+
+    def __init__(self, failing):
+        self.failing = set(failing)
+        self.active = 0
+        self.max_active = 0
+
+    async def translate(self, text, src, dest):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(0.001)
+            if text in self.failing:
+                raise RuntimeError(f"翻译 {text} 失败")
+            return type("Translated", (), {"text": f"en:{text}"})()
+        finally:
+            self.active -= 1
+
+
+def test_google_backend_keeps_successes():
+    backend = GoogleTranslateBackend(concurrency=2)
+    backend._translator = FakeTranslator(failing=["坏词"])
+    words = ["词一", "坏词", "词二", "词三"]
+    result = asyncio.run(backend.translate_many(words, "zh-cn", "en"))
+    # 单个词失败不影响其他词
+    assert result == {"词一": "en:词一", "词二": "en:词二", "词三": "en:词三"}
+    assert backend._translator.max_active == 2
+
+
+def test_globals_restored():
+    before = (translate._backends, translation_cache._translation_cache)
+    with isolated_translation([DictionaryBackend(entries={})]):
+        pass
+    assert (translate._backends, translation_cache._translation_cache) == before
+
+
+def test_incomplete_backend_rejected():
+    class Incomplete(TranslationBackend):
+        name = "incomplete"
+
+    try:
+        Incomplete()
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("未实现 translate_many 的后端应在创建时报错")
+
+
+if __name__ == "__main__":
+    test_bundled_dictionary()
+    test_dictionary_first_then_batched_network()
+    test_failure_returns_original_word()
+    test_google_backend_keeps_successes()
+    test_globals_restored()
+    test_incomplete_backend_rejected()
+    print("✅ 翻译后端测试通过")
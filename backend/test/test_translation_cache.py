@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+测试翻译缓存
+验证LRU淘汰、TTL过期、SQLite持久化（重启后从磁盘读回）以及异步批量读写
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(project_root)
+
+from backend.services.translation_cache import TranslationCache
+
+
+def test_lru_eviction():
+    cache = TranslationCache(None, max_size=2)
+    cache.set("项目", "zh-cn", "en", "project")
+    cache.set("空投", "zh-cn", "en", "airdrop")
+    assert cache.get("项目", "zh-cn", "en") == "project"  # 项目 变为最近使用
+    cache.set("叙事", "zh-cn", "en", "narrative")
+    assert cache.get("空投", "zh-cn", "en") is None
+    assert cache.get("项目", "zh-cn", "en") == "project"
+    stats = cache.get_stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 2 and stats["misses"] == 1
+
+
+def test_ttl_expiry():
+    cache = TranslationCache(None, ttl=0.05)
+    cache.set("社区", "zh-cn", "en", "community")
+    assert cache.get("社区", "zh-cn", "en") == "community"
+    time.sleep(0.1)
+    assert cache.get("社区", "zh-cn", "en") is None
+
+
+def test_sqlite_persistence():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "translation_cache.sqlite3")
+        cache = TranslationCache(db_path)
+        cache.set("发币", "zh-cn", "en", "token launch")
+        cache.close()
+
+        reopened = TranslationCache(db_path, max_size=1)
+        assert reopened.contains("发币", "zh-cn", "en")
+        assert reopened.get("发币", "zh-cn", "en") == "token launch"
+        assert reopened.get_stats()["disk_hits"] == 1
+        assert reopened.get("发币", "zh-cn", "en") == "token launch"
+        assert reopened.get_stats()["hits"] == 1
+        assert reopened.get("发币", "en", "zh-cn") is None
+        reopened.close()
+
+
+def test_async_batch_access():
+    async def run(db_path):
+        cache = TranslationCache(db_path)
+        await cache.set_many({"项目": "project", "空投": "airdrop", "叙事": "narrative"}, "zh-cn", "en")
+        assert cache.get_stats()["disk_writes"] == 1  # 整批一个事务
+        cache.close()
+
+        reopened = TranslationCache(db_path, max_size=2)
+        assert await reopened.contains_many(["项目", "社区"], "zh-cn", "en") == {"项目"}
+        assert await reopened.get_many(["项目", "空投", "社区"], "zh-cn", "en") == {"项目": "project", "空投": "airdrop"}
+        assert await reopened.get_many(["项目"], "zh-cn", "en") == {"项目": "project"}
+        stats = reopened.get_stats()
+        assert stats["disk_hits"] == 2 and stats["hits"] == 1 and stats["misses"] == 1
+        reopened.close()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(run(os.path.join(tmp, "translation_cache.sqlite3")))
+
+
+if __name__ == "__main__":
+    test_lru_eviction()
+    test_ttl_expiry()
+    test_sqlite_persistence()
+    test_async_batch_access()
+    print("✅ 翻译缓存测试通过")
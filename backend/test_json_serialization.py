@@ -9,8 +9,9 @@ import sys
 import os
 from datetime import datetime
 
-# 添加backend目录到Python路径
+# 添加backend目录和项目根目录到Python路径（models.token 依赖 backend.utils）
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from models.token import TokenData, AnalysisResult, NarrativeAnalysis, RiskLevel, MarketAnalysis
 
@@ -0,0 +1,46 @@
+"""
+消息编码
+每个事件只序列化一次，WebSocket广播 / Redis队列 / pub-sub 复用同一份JSON字符串
+安装了orjson时使用orjson，否则回退到标准库json
+"""
+
+import json
+from typing import Any, Iterable, Optional
+from datetime import datetime
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+
+def dumps(obj: Any) -> str:
+    """序列化为JSON字符串"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj)
+
+
+def encode_json_array(items_json: Iterable[str]) -> str:
+    """将已编码的JSON片段拼接为JSON数组"""
+    return "[" + ",".join(items_json) + "]"
+
+
+def encode_envelope(msg_type: str, data_json: str, timestamp: Optional[str] = None) -> str:
+    """
+    组装推送消息 {"type", "data", "timestamp"}
+
+    Args:
+        msg_type: 消息类型，如 new_token / analysis_update
+        data_json: 已编码的data字段JSON，直接嵌入不再重复序列化
+        timestamp: ISO时间戳，默认当前时间
+    """
+    timestamp = timestamp or datetime.now().isoformat()
+    return f'{{"type":{dumps(msg_type)},"data":{data_json},"timestamp":{dumps(timestamp)}}}'
+
+
+def encode_analysis_task(token_json: str, created_at: str, task_id: str) -> str:
+    """组装分析任务 {"token_data", "created_at", "task_id"}，token_data为已编码JSON"""
+    return f'{{"token_data":{token_json},"created_at":{dumps(created_at)},"task_id":{dumps(task_id)}}}'
@@ -0,0 +1,35 @@
+"""
+Solana公钥编码
+原始32字节 -> base58字符串，对高频重复的地址(creator/user)提供有界LRU缓存
+"""
+
+from functools import lru_cache
+
+from solders.pubkey import Pubkey  # type: ignore
+
+# 缓存条目上限，连环发币的creator数量远小于此值
+PUBKEY_CACHE_SIZE = 8192
+
+
+def encode_pubkey(raw: bytes) -> str:
+    """编码公钥，不走缓存（适用于mint/bonding_curve等一次性地址）"""
+    return str(Pubkey.from_bytes(raw))
+
+
+@lru_cache(maxsize=PUBKEY_CACHE_SIZE)
+def encode_pubkey_cached(raw: bytes) -> str:
+    """编码公钥并按原始字节缓存结果"""
+    return str(Pubkey.from_bytes(raw))
+
+
+def pubkey_cache_info() -> dict:
+    """返回缓存命中统计"""
+    info = encode_pubkey_cached.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "max_size": info.maxsize,
+        "hit_rate": info.hits / lookups if lookups else 0.0,
+    }
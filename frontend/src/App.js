@@ -50,6 +50,24 @@ function App() {
           });
           break;
 
+        case 'new_tokens':
+          console.log('🪙 App处理新代币批次:', data.data.length);
+
+          setTokens(prev => {
+            const newTokens = new Map(prev);
+            data.data.forEach(token => {
+              newTokens.set(token.mint, {
+                ...token,
+                analysisStatus: 'PENDING',
+                analysisProgress: 0,
+                analysisResult: null
+              });
+            });
+            console.log('🪙 代币批次已添加到状态，当前代币数量:', newTokens.size);
+            return newTokens;
+          });
+          break;
+
         case 'analysis_update':
           console.log('🔄 App处理分析更新:', data.data.token_symbol, data.data.progress + '%');
 
@@ -73,6 +73,9 @@ export const useWebSocket = (url, options = {}) => {
           if (data.type === 'new_token') {
             console.log('🪙 收到新代币消息:', data.data.symbol, data.data.name);
           }
+          if (data.type === 'new_tokens') {
+            console.log('🪙 收到新代币批次:', data.data.map(t => t.symbol).join(', '));
+          }
           if (data.type === 'analysis_update') {
             console.log('🔄 收到分析更新:', data.data.token_symbol, data.data.progress + '%');
           }
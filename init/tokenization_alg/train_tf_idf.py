@@ -3,11 +3,28 @@ import jieba
 import nltk
 from nltk.corpus import stopwords
 from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+import argparse
+import hashlib
+import math
 import pickle
 import os
 
 
+_stop_words = None
 
+# 默认语料目录和模型路径都相对于本脚本所在目录，服务端默认加载同一个模型文件（backend/services/keyword_model.py）
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CORPUS_DIR = os.path.join(SCRIPT_DIR, "train")
+DEFAULT_OUTPUT_PATH = os.path.join(SCRIPT_DIR, "keyword_model.pkl")
+
+
+def get_stop_words():
+    """中英文停用词集合，只构建一次"""
+    global _stop_words
+    if _stop_words is None:
+        _stop_words = frozenset(stopwords.words('chinese') + stopwords.words('english'))
+    return _stop_words
 
 
 def process_text(text):
@@ -35,35 +52,180 @@ def process_text(text):
     words = chinese_words + english_words
     
     # 移除停用词（中文和英文）
-    stop_words = set(stopwords.words('chinese') + stopwords.words('english'))
+    stop_words = get_stop_words()
     words = [word for word in words if word not in stop_words and word.strip()]
 
 
     return words
 
-def train_keyword_model(corpus_files, priority_keywords=None, output_path='keyword_model.pkl'):
+def compute_idf(doc_freq, n_docs):
+    """
+    计算平滑IDF：idf = ln((1 + N) / (1 + df)) + 1，与 sklearn TfidfVectorizer(smooth_idf=True) 一致。
+    返回 (idf字典, 未登录词的默认idf)。
+    """
+    idf = {word: math.log((1 + n_docs) / (1 + df)) + 1 for word, df in doc_freq.items()}
+    default_idf = math.log(1 + n_docs) + 1
+    return idf, default_idf
+
+
+def count_lines(lines):
+    """
+    统计一批文本行（每个非空行视为一篇文档）的词频、文档频率和文档数。
+    在进程池中运行，返回值会被pickle回主进程。
+    """
+    word_freq = Counter()
+    doc_freq = Counter()
+    n_docs = 0
+    for line in lines:
+        words = process_text(line)
+        if not words:
+            continue
+        word_freq.update(words)
+        doc_freq.update(set(words))
+        n_docs += 1
+    return word_freq, doc_freq, n_docs
+
+
+def iter_chunks(file_path, chunk_lines=2000):
+    """流式读取语料文件，每次产出chunk_lines行，不把整个文件读入内存"""
+    chunk = []
+    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            chunk.append(line)
+            if len(chunk) >= chunk_lines:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def count_file(file_path, executor=None, chunk_lines=2000, max_pending=None):
+    """
+    统计单个语料文件，按块分发到进程池分词后合并计数。
+    同时在途的块最多 max_pending 个（默认进程数的2倍），每完成一个就合并并读取下一块，
+    内存中只保留这几个块，不会把整个文件读入内存。
+    返回 {"word_freq", "doc_freq", "n_docs"}。
+    """
+    word_freq = Counter()
+    doc_freq = Counter()
+    n_docs = 0
+
+    def merge(result):
+        nonlocal n_docs
+        chunk_word_freq, chunk_doc_freq, chunk_docs = result
+        word_freq.update(chunk_word_freq)
+        doc_freq.update(chunk_doc_freq)
+        n_docs += chunk_docs
+
+    chunks = iter_chunks(file_path, chunk_lines)
+    if executor is None:
+        for chunk in chunks:
+            merge(count_lines(chunk))
+    else:
+        max_pending = max_pending or (os.cpu_count() or 1) * 2
+        pending = set()
+        for chunk in chunks:
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    merge(future.result())
+            pending.add(executor.submit(count_lines, chunk))
+        for future in as_completed(pending):
+            merge(future.result())
+    return {"word_freq": word_freq, "doc_freq": doc_freq, "n_docs": n_docs}
+
+
+def _partial_path(partials_dir, file_path):
+    digest = hashlib.sha1(os.path.abspath(file_path).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(partials_dir, f"{os.path.basename(file_path)}.{digest}.pkl")
+
+
+def load_partial(partials_dir, file_path):
+    """读取文件的部分计数，文件路径、大小和修改时间都一致时才有效"""
+    path = _partial_path(partials_dir, file_path)
+    try:
+        with open(path, 'rb') as f:
+            partial = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+    stat = os.stat(file_path)
+    if (partial.get("path") != os.path.abspath(file_path)
+            or partial.get("size") != stat.st_size
+            or partial.get("mtime") != stat.st_mtime):
+        return None
+    return partial
+
+
+def save_partial(partials_dir, file_path, counts):
+    """保存单个语料文件的部分计数，以文件路径+大小+修改时间作为有效性标识"""
+    os.makedirs(partials_dir, exist_ok=True)
+    stat = os.stat(file_path)
+    partial = dict(counts, path=os.path.abspath(file_path), size=stat.st_size, mtime=stat.st_mtime)
+    _atomic_dump(partial, _partial_path(partials_dir, file_path))
+
+
+def _atomic_dump(obj, path):
+    """先写临时文件再替换，读取方（如服务端的模型热加载）不会读到写了一半的文件"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(obj, f)
+    os.replace(tmp_path, path)
+
+
+def train_keyword_model(corpus_files, priority_keywords=None, output_path=DEFAULT_OUTPUT_PATH,
+                        workers=None, chunk_lines=2000, partials_dir=None, rebuild=False):
     """
     从语料库文件列表中训练关键词模型，仅保留中英文，保存为 pickle 文件。
+    语料中的每个非空行视为一篇文档，用于统计文档频率并计算IDF。
+
+    文件按块流式读取，在进程池中并行分词后合并计数。每个文件的部分计数保存在 partials_dir，
+    文件未变化（路径、大小、修改时间一致）时直接复用，新增语料只需统计新文件。
     
     参数：
     - corpus_files: 语料库文件路径列表
     - priority_keywords: 优先级关键词列表（可选）
     - output_path: 保存模型的路径
+    - workers: 分词进程数，默认CPU核数；为1时在当前进程中运行
+    - chunk_lines: 每个分词任务包含的行数
+    - partials_dir: 部分计数目录，默认 <output_path>.partials
+    - rebuild: 为True时忽略已有的部分计数，全部重新统计
+
+    保存的模型为字典：
+    - word_freq: 关键词频率 Counter
+    - idf: 关键词 -> 平滑IDF
+    - default_idf: 语料中未出现的词使用的IDF
+    - n_docs: 文档数
     """
+    partials_dir = partials_dir or f"{output_path}.partials"
+
     # 初始化关键词频率计数器,因为本次不需要避免极端大词的影响
     word_freq = Counter()
-    
-    # 处理每个语料库文件
-    for file_path in corpus_files:
-        if not os.path.exists(file_path):
-            print(f"文件 {file_path} 不存在，跳过")
-            continue
-        print(file_path)
-        with open(file_path, 'r', encoding='utf-8',errors='ignore') as f:
-            text = f.read()
-            # 预处理文本并更新频率
-            words = process_text(text)
-            word_freq.update(words)
+    doc_freq = Counter()
+    n_docs = 0
+    reused = 0
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers != 1 else None
+    max_pending = (workers or os.cpu_count() or 1) * 2
+    try:
+        # 处理每个语料库文件
+        for file_path in corpus_files:
+            if not os.path.exists(file_path):
+                print(f"文件 {file_path} 不存在，跳过")
+                continue
+            counts = None if rebuild else load_partial(partials_dir, file_path)
+            if counts is not None:
+                reused += 1
+                print(f"{file_path}（复用部分计数）")
+            else:
+                print(file_path)
+                counts = count_file(file_path, executor, chunk_lines, max_pending)
+                save_partial(partials_dir, file_path, counts)
+            word_freq.update(counts["word_freq"])
+            doc_freq.update(counts["doc_freq"])
+            n_docs += counts["n_docs"]
+    finally:
+        if executor:
+            executor.shutdown()
     
     # 为优先级关键词加权（频率加倍）
     if priority_keywords:
@@ -71,23 +233,43 @@ def train_keyword_model(corpus_files, priority_keywords=None, output_path='keywo
             if keyword in word_freq:
                 word_freq[keyword] *= 2  # 可调整权重因子
     
+    idf, default_idf = compute_idf(doc_freq, n_docs)
+    model = {
+        "word_freq": word_freq,
+        "idf": idf,
+        "default_idf": default_idf,
+        "n_docs": n_docs,
+    }
+
     # 保存模型
-    with open(output_path, 'wb') as f:
-        pickle.dump(word_freq, f)
-    print(f"模型已保存至 {output_path}")
+    _atomic_dump(model, output_path)
+    print(f"模型已保存至 {output_path}（{len(word_freq)} 个词，{n_docs} 篇文档，复用 {reused} 个文件的部分计数）")
     
-    return word_freq
+    return model
 
-# 示例用法
-if __name__ == "__main__":
-    # 假设语料库文件列表（支持多个 .txt 文件）
-    # corpus_files = ['corpus1.txt', 'corpus2.txt']  # 替换为实际文件路径
-    # 优先级关键词
-    # priority_keywords = ['关键词', '自然语言', '提取']
-    prefix = os.path.join("./train")
-    corpus_files = [os.path.join(prefix, file) for file in os.listdir(prefix)]
-   
-    # 训练并保存模型
-    model = train_keyword_model(corpus_files, [], 'keyword_model.pkl')
 
+def main():
+    parser = argparse.ArgumentParser(description="训练关键词模型（词频 + IDF）")
+    parser.add_argument("--corpus-dir", default=DEFAULT_CORPUS_DIR, help="语料目录，目录下所有文件都参与训练")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_PATH, help="模型输出路径，默认即服务端加载的模型文件")
+    parser.add_argument("--priority", nargs="*", default=[], help="优先级关键词")
+    parser.add_argument("--workers", type=int, default=None, help="分词进程数，默认CPU核数")
+    parser.add_argument("--chunk-lines", type=int, default=2000, help="每个分词任务的行数")
+    parser.add_argument("--partials-dir", default=None, help="部分计数目录，默认 <output>.partials")
+    parser.add_argument("--rebuild", action="store_true", help="忽略已有部分计数，全部重新统计")
+    args = parser.parse_args()
+
+    corpus_files = sorted(os.path.join(args.corpus_dir, file) for file in os.listdir(args.corpus_dir))
+    train_keyword_model(
+        corpus_files,
+        args.priority,
+        args.output,
+        workers=args.workers,
+        chunk_lines=args.chunk_lines,
+        partials_dir=args.partials_dir,
+        rebuild=args.rebuild,
+    )
 
+
+if __name__ == "__main__":
+    main()